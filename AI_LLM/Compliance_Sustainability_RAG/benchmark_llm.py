@@ -0,0 +1,93 @@
+"""Compare the default flan-t5 pipeline with the quantized, batched inference path.
+
+Reports tokens/sec and p50/p95 latency for sequential and concurrent requests:
+
+    python benchmark_llm.py --requests 32 --concurrency 8
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+
+from fast_llm import BatchedGenerator
+
+MODEL_NAME = "google/flan-t5-base"
+QUESTIONS = [
+    "Which supplier has the worst compliance record?",
+    "Are there any products that are both highly sustainable and fully compliant?",
+    "What hazards are most common for non-compliant products?",
+    "Which products should be prioritised for an audit?",
+]
+
+
+def build_prompts(n):
+    """RetrievalQA-style prompts: three data rows as context plus a question"""
+    df = pd.read_csv('preprocessed_data.csv')
+    cols = ['Product Name_x', 'Category', 'Compliance Status', 'Hazard Classification', 'Region', 'Product Name_y']
+    rows = df[cols].astype(str).agg(' | '.join, axis=1).tolist()
+    prompts = []
+    for i in range(n):
+        context = '\n\n'.join(rows[(3 * i + j) % len(rows)] for j in range(3))
+        prompts.append(f"Use the following pieces of context to answer the question at the end.\n\n"
+                       f"{context}\n\nQuestion: {QUESTIONS[i % len(QUESTIONS)]}\nHelpful Answer:")
+    return prompts
+
+
+def summarize(name, latencies, tokens, wall):
+    latencies = np.asarray(latencies) * 1000
+    print(f"{name:<32} {tokens / wall:>10.1f} {np.percentile(latencies, 50):>10.0f} "
+          f"{np.percentile(latencies, 95):>10.0f} {len(latencies) / wall:>8.2f}")
+
+
+def timed_run(call, prompts, concurrency):
+    """Run call(prompt) -> (text, n_tokens) for every prompt; return latencies, tokens, wall time"""
+    def one(prompt):
+        start = time.perf_counter()
+        _, n_tokens = call(prompt)
+        return time.perf_counter() - start, n_tokens
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, prompts))
+    wall = time.perf_counter() - start
+    return [r[0] for r in results], sum(r[1] for r in results), wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=32)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--max-new-tokens', type=int, default=128)
+    args = parser.parse_args()
+
+    prompts = build_prompts(args.requests)
+
+    # Current implementation: fp32 pipeline, max_length=512, one generate call per question
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
+    pipe = pipeline("text2text-generation", model=model, tokenizer=tokenizer, max_length=512, device="cpu")
+    pipe(prompts[0])  # warm-up, so both paths are compared warm
+
+    def baseline(prompt):
+        text = pipe(prompt)[0]['generated_text']
+        return text, len(tokenizer(text).input_ids)
+
+    generator = BatchedGenerator(MODEL_NAME, max_new_tokens=args.max_new_tokens,
+                                 max_batch_size=args.concurrency)
+
+    def fast(prompt):
+        text = generator(prompt)
+        return text, len(generator.tokenizer(text).input_ids)
+
+    print(f"{'backend':<32} {'tokens/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'req/s':>8}")
+    summarize("pipeline fp32 (sequential)", *timed_run(baseline, prompts, 1))
+    summarize(f"pipeline fp32 ({args.concurrency} threads)", *timed_run(baseline, prompts, args.concurrency))
+    summarize("int8 batched (sequential)", *timed_run(fast, prompts, 1))
+    summarize(f"int8 batched ({args.concurrency} threads)", *timed_run(fast, prompts, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
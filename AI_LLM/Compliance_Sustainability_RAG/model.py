@@ -1,17 +1,38 @@
+import os
+import sys
 from langchain.embeddings import HuggingFaceEmbeddings
 from langchain.llms import HuggingFacePipeline
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain_community.document_loaders import DataFrameLoader
 from langchain.chains import RetrievalQA
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.schema import Document, format_document
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
-import torch
+import operator
+import time
+from functools import lru_cache
+import faiss
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-def initialize_components():
-    """Initialize all required components with proper configuration"""
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))  # AI_LLM/, for rag_common
+from rag_common.answer_cache import AnswerCache, normalize_question
+from rag_common.context_packer import pack_context, tokenizer_token_counter
+from query_router import route_question
+from report_engine import data_version, get_report_stats, format_report_summary
+from fast_llm import BatchedGenerator, BatchedSeq2SeqLLM
+
+LLM_MODEL_NAME = "google/flan-t5-base"
+
+def initialize_components(fast_inference=False, max_new_tokens=128):
+    """Initialize all required components with proper configuration.
+
+    With fast_inference=True the LLM is an int8-quantized, preloaded flan-t5
+    that batches concurrent questions into one generate call (see fast_llm.py).
+    """
     # 1. Load and prepare data
     df = pd.read_csv('preprocessed_data.csv')
     
@@ -57,20 +78,24 @@ def initialize_components():
     vectorstore.save_local("compliance_faiss_index")
     
     # 5. Set up LLM pipeline
-    model_name = "google/flan-t5-base"
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-    
-    pipe = pipeline(
-        "text2text-generation",
-        model=model,
-        tokenizer=tokenizer,
-        max_length=512,
-        device="cpu"
-    )
-    
-    # 6. Create LLM wrapper
-    llm = HuggingFacePipeline(pipeline=pipe)
+    model_name = LLM_MODEL_NAME
+    if fast_inference:
+        # 6. Quantized, warmed model with request batching
+        llm = BatchedSeq2SeqLLM(generator=BatchedGenerator(model_name, max_new_tokens=max_new_tokens))
+    else:
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+
+        pipe = pipeline(
+            "text2text-generation",
+            model=model,
+            tokenizer=tokenizer,
+            max_length=512,
+            device="cpu"
+        )
+
+        # 6. Create LLM wrapper
+        llm = HuggingFacePipeline(pipeline=pipe)
     
     # 7. Create RAG chain
     qa_chain = RetrievalQA.from_chain_type(
@@ -84,8 +109,15 @@ def initialize_components():
 
 
 
-def generate_report(qa_chain, report_type):
-    """Generate compliance or sustainability report"""
+def generate_report(qa_chain, report_type, df=None, max_context_tokens=400):
+    """Generate compliance or sustainability report.
+
+    When the DataFrame is passed, the statistics are computed over the whole
+    dataset (cached per data version) and the compact summary is handed to the
+    LLM as its only context instead of three retrieved rows. The instructions
+    and the packed summary together fit in max_context_tokens of flan-t5's
+    512-token input; the returned report keeps the full summary.
+    """
     if report_type == "compliance":
         prompt = """
         Analyze the compliance data and generate a comprehensive report covering:
@@ -112,15 +144,192 @@ def generate_report(qa_chain, report_type):
         
         Provide specific recommendations for improving sustainability.
         """
-    return qa_chain.invoke({"query": prompt})['result']
+    if df is None:
+        return qa_chain.invoke({"query": prompt})['result']
+
+    summary = format_report_summary(get_report_stats(df), report_type)
+    budget = max(max_context_tokens - _context_token_counter()(prompt), 0)
+    docs, _ = _pack(prompt, [Document(page_content=summary, metadata={"source": "report_engine"})], budget)
+    result = qa_chain.combine_documents_chain.invoke({"input_documents": docs, "question": prompt})
+    return f"{summary}\n\nInsights:\n{result['output_text']}"
+
+def create_answer_cache(qa_chain, df, **kwargs):
+    """Answer cache sharing the chain's embedding model, keyed on the data version"""
+    embeddings = qa_chain.retriever.vectorstore.embeddings
+    return AnswerCache(embed_fn=embeddings.embed_query, index_version=data_version(df), **kwargs)
+
+def answer_question(qa_chain, question, df=None, cache=None, max_context_tokens=400):
+    """Answer a question with source references.
+
+    When the DataFrame is passed, aggregate/filter/ranking questions are answered
+    directly from it; only free-text questions go through the retrieval chain.
+    Passing an AnswerCache skips retrieval and generation for repeated or
+    near-duplicate questions. Rows come from the chain's retriever and are
+    packed into max_context_tokens before the chain's prompt is filled.
+    """
+    answer = route_question(df, question) if df is not None else None
+    if answer is None and cache is not None:
+        answer = cache.get(question)
+    if answer is not None:
+        return answer
+
+    docs, _ = _pack(question, qa_chain.retriever.invoke(question), max_context_tokens)
+    result = qa_chain.combine_documents_chain.invoke({"input_documents": docs, "question": question})
+    answer = {"answer": result["output_text"].strip(), "sources": [doc.metadata for doc in docs]}
+    if cache is not None:
+        cache.put(question, answer)
+    return answer
+
+@lru_cache(maxsize=None)
+def _context_token_counter(model_name=LLM_MODEL_NAME):
+    """Count context tokens with the generator's own tokenizer (flan-t5 reads at most 512 input tokens)"""
+    return tokenizer_token_counter(AutoTokenizer.from_pretrained(model_name))
 
-def answer_question(qa_chain, question):
-    """Answer a question with source references"""
-    result = qa_chain.invoke({"query": question})
-    return {
-        "answer": result['result'],
-        "sources": [doc.metadata for doc in result['source_documents']]
-    }
+def _pack(question, docs, max_context_tokens):
+    """Drop chunks with duplicate text, then pack the rest into the token budget, nearest first"""
+    seen_text = set()
+    unique_docs = []
+    for doc in docs:
+        if doc.page_content not in seen_text:
+            seen_text.add(doc.page_content)
+            unique_docs.append(doc)
+    return pack_context(question, unique_docs, max_tokens=max_context_tokens,
+                        count_tokens=_context_token_counter())
+
+def _search_by_vectors(vectorstore, vectors, k=4, score_threshold=None):
+    """Search a FAISS store for a batch of query vectors with one index.search call.
+
+    Applies the store's L2 normalization and, for score_threshold, its distance
+    strategy, like FAISS.similarity_search_by_vector. A row retrieved by several
+    questions is loaded from the docstore once and shared between them.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectorstore._normalize_L2:
+        faiss.normalize_L2(vectors)
+    scores, indices = vectorstore.index.search(vectors, k)
+    better = (operator.ge if vectorstore.distance_strategy in
+              (DistanceStrategy.MAX_INNER_PRODUCT, DistanceStrategy.JACCARD) else operator.le)
+    shared = {}
+    retrieved = []
+    for row_scores, row_indices in zip(scores, indices):
+        docs = []
+        for score, i in zip(row_scores, row_indices):
+            # -1 marks a missing hit when the index holds fewer than k rows
+            if i == -1 or (score_threshold is not None and not better(score, score_threshold)):
+                continue
+            if i not in shared:
+                shared[i] = vectorstore.docstore.search(vectorstore.index_to_docstore_id[i])
+            docs.append(shared[i])
+        retrieved.append(docs)
+    return retrieved
+
+def answer_questions(qa_chain, questions, df=None, cache=None, max_context_tokens=400):
+    """Answer a batch of questions with one embedding call, one FAISS search and one LLM call.
+
+    Structured questions are answered by the query router and repeated questions
+    are answered once. Retrieval follows the chain's retriever settings and
+    generation uses the chain's prompt. Rows shared by several questions are
+    loaded and formatted once.
+    Each question's context is packed into max_context_tokens of the generator's
+    tokenizer (flan-t5 reads at most 512 input tokens), nearest rows first.
+    Returns (results, stats); each result carries its latency from batch start.
+    """
+    batch_start = time.perf_counter()
+    stats = {"questions": len(questions), "structured": 0, "cached": 0, "stage_seconds": {}}
+    results = [None] * len(questions)
+
+    def elapsed():
+        return time.perf_counter() - batch_start
+
+    # 1. Router and cache: everything that does not need the LLM
+    pending = {}  # normalized question -> indices in the batch
+    for i, question in enumerate(questions):
+        answer = route_question(df, question) if df is not None else None
+        if answer is not None:
+            stats["structured"] += 1
+        elif cache is not None:
+            answer = cache.get(question)
+            stats["cached"] += answer is not None
+        if answer is not None:
+            results[i] = {**answer, "latency_ms": elapsed() * 1000}
+        else:
+            pending.setdefault(normalize_question(question), []).append(i)
+    stats["stage_seconds"]["route_and_cache"] = elapsed()
+
+    unique_questions = [questions[indices[0]] for indices in pending.values()]
+    stats["llm_questions"] = len(unique_questions)
+    if unique_questions:
+        retriever = qa_chain.retriever
+        stuff_chain = qa_chain.combine_documents_chain
+
+        # 2. Retrieve with the chain's retriever settings (search_type, search_kwargs); plain
+        # similarity search embeds all queries in one call and runs one batched FAISS search.
+        # Metadata filters and other search types go through the retriever, one query each.
+        vectorstore = retriever.vectorstore
+        if (retriever.search_type == "similarity" and isinstance(vectorstore, FAISS)
+                and set(retriever.search_kwargs) <= {"k", "score_threshold"}):
+            t = time.perf_counter()
+            embeddings = vectorstore.embeddings
+            if len(unique_questions) == 1:
+                vectors = [embeddings.embed_query(unique_questions[0])]
+            else:
+                vectors = embeddings.embed_documents(unique_questions)
+            stats["stage_seconds"]["embed"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            retrieved = _search_by_vectors(vectorstore, vectors, **retriever.search_kwargs)
+        else:
+            t = time.perf_counter()
+            retrieved = retriever.batch(unique_questions)
+        stats["stage_seconds"]["search"] = time.perf_counter() - t
+
+        # 3. Drop duplicate chunks and pack each question's context to the token budget
+        t = time.perf_counter()
+        contexts = []
+        stats["context_tokens"] = {"unpacked": 0, "packed": 0}
+        for question, found in zip(unique_questions, retrieved):
+            docs, pack_stats = _pack(question, found, max_context_tokens)
+            stats["context_tokens"]["unpacked"] += pack_stats["input_tokens"]
+            stats["context_tokens"]["packed"] += pack_stats["packed_tokens"]
+            contexts.append(docs)
+
+        # Format every distinct row once, then fill the chain's prompt for each question
+        formatted = {}
+        prompts = []
+        for question, docs in zip(unique_questions, contexts):
+            for doc in docs:
+                if doc.page_content not in formatted:
+                    formatted[doc.page_content] = format_document(doc, stuff_chain.document_prompt)
+            context = stuff_chain.document_separator.join(formatted[doc.page_content] for doc in docs)
+            prompts.append(stuff_chain.llm_chain.prompt.format(
+                **{stuff_chain.document_variable_name: context, "question": question}))
+        stats["context_docs"] = sum(len(docs) for docs in contexts)
+        stats["unique_context_docs"] = len(formatted)
+        stats["stage_seconds"]["context"] = time.perf_counter() - t
+
+        # 4. One llm.generate call for every prompt: the HuggingFace pipeline runs them in
+        # batches, and the batched LLM (fast_inference=True) coalesces them into generate calls
+        t = time.perf_counter()
+        generations = stuff_chain.llm_chain.llm.generate(prompts).generations
+        stats["stage_seconds"]["generate"] = time.perf_counter() - t
+
+        done = elapsed() * 1000
+        for question, docs, generation, indices in zip(unique_questions, contexts, generations, pending.values()):
+            answer = {"answer": generation[0].text.strip(), "sources": [doc.metadata for doc in docs]}
+            if cache is not None:
+                cache.put(question, answer)
+            for i in indices:
+                results[i] = {**answer, "latency_ms": done}
+
+    total = elapsed()
+    latencies = np.array([r["latency_ms"] for r in results]) if results else np.zeros(1)
+    stats.update({
+        "total_seconds": total,
+        "throughput_qps": len(questions) / total if total else float("inf"),
+        "latency_ms_p50": float(np.percentile(latencies, 50)),
+        "latency_ms_p95": float(np.percentile(latencies, 95)),
+    })
+    return results, stats
 
 def generate_visualization(df, metric):
     """Generate and analyze visualization"""
@@ -154,10 +363,10 @@ def main():
     
     # Generate reports
     print("\nGenerating Compliance Report...")
-    print(generate_report(qa_chain, "compliance"))
+    print(generate_report(qa_chain, "compliance", df))
     
     print("\nAnalyzing Sustainability Metrics...")
-    print(generate_report(qa_chain, "sustainability"))
+    print(generate_report(qa_chain, "sustainability", df))
     
     # Example questions
     questions = [
@@ -167,12 +376,18 @@ def main():
         "What is the relationship between lead time and product availability?"
     ]
     
+    cache = create_answer_cache(qa_chain, df)
+
     print("\nAnswering Sample Questions:")
-    for q in questions:
+    results, batch_stats = answer_questions(qa_chain, questions, df, cache)
+    for q, result in zip(questions, results):
         print(f"\nQ: {q}")
-        result = answer_question(qa_chain, q)
         print(f"A: {result['answer']}")
-        print("Sources:", result['sources'][0])
+        print("Sources:", result['sources'][0] if result['sources'] else None)
+        print(f"Latency: {result['latency_ms']:.0f} ms")
+    print(f"\nBatch: {batch_stats['questions']} questions in {batch_stats['total_seconds']:.2f}s "
+          f"({batch_stats['throughput_qps']:.2f} questions/s, p95 {batch_stats['latency_ms_p95']:.0f} ms)")
+    print("Answer cache:", cache.stats())
     
     # Generate visualizations
     print("\nGenerating Visualizations:")
@@ -0,0 +1,309 @@
+import re
+import pandas as pd
+
+# Numeric columns that can be aggregated, with the phrases users use for them.
+# The bool says whether a higher value is "better" (used for best/worst questions).
+METRICS = {
+    'Compliance Status': (['compliance record', 'compliance rate', 'compliance'], True),
+    'CO2 Emissions (tons)': (['co2 emissions', 'co2', 'emissions', 'carbon dioxide'], False),
+    'Carbon Footprint (tons)': (['carbon footprint', 'footprint'], False),
+    'Energy Efficiency': (['energy efficiency'], True),
+    'Energy Usage (kWh)': (['energy usage', 'energy use', 'energy consumption', 'kwh'], False),
+    'Material Efficiency (%)': (['material efficiency'], True),
+    'Lead Time (days)': (['lead time', 'lead times'], False),
+}
+
+# Columns a question can group or rank by ("which supplier ...", "per region")
+GROUP_COLUMNS = {
+    'Supplier Name': ['supplier', 'suppliers'],
+    'Region': ['region', 'regions'],
+    'Category': ['category', 'categories'],
+    'Hazard Classification': ['hazard classification', 'hazard'],
+    'Product Availability': ['product availability', 'availability'],
+    'Product Name_y': ['product', 'products'],
+}
+
+# Categorical columns whose values can be used as filters ("products from Europe")
+FILTER_COLUMNS = ['Region', 'Supplier Name', 'Category', 'Hazard Classification',
+                  'Product Availability', 'Compliance Category', 'Product Name_x', 'Product Name_y']
+
+AGGREGATIONS = [
+    ('mean', ['average', 'mean', 'avg']),
+    ('median', ['median']),
+    ('sum', ['total', 'sum of', 'overall amount']),
+    ('max', ['maximum', 'max']),
+    ('min', ['minimum', 'min']),
+]
+
+RANK_HIGH = ['highest', 'most', 'largest', 'biggest', 'top']
+RANK_LOW = ['lowest', 'least', 'smallest', 'fewest']
+RANK_GOOD = ['best', 'better', 'cleanest', 'greenest']
+RANK_BAD = ['worst', 'poorest', 'dirtiest']
+
+
+def _contains(text, phrase):
+    return re.search(r'\b' + re.escape(phrase) + r'\b', text) is not None
+
+
+def _first_match(text, options):
+    """Return the first key whose phrases occur in text (longest phrases win)."""
+    candidates = [(len(p), key) for key, phrases in options for p in phrases if _contains(text, p)]
+    return max(candidates)[1] if candidates else None
+
+
+def _find_aggregation(text):
+    """Return the aggregation asked for, only when it appears in an aggregation phrase.
+
+    A bare "mean" or "average" is not enough ("what does compliance mean ...").
+    The word must come right before a metric ("average CO2 emissions",
+    "sum of the lead time"), follow "what is the" ("what is the median ..."),
+    or appear as "on average".
+    """
+    metric_phrases = '|'.join(re.escape(p) for phrases, _ in METRICS.values()
+                              for p in sorted(phrases, key=len, reverse=True))
+    candidates = []
+    for key, words in AGGREGATIONS:
+        for word in words:
+            w = re.escape(word)
+            if (re.search(r'\b' + w + r'\s+(?:of\s+)?(?:the\s+)?(?:' + metric_phrases + r')\b', text)
+                    or re.search(r"\bwhat(?:\s+is|\s+was|'s)\s+the\s+" + w + r'\b', text)):
+                candidates.append((len(word), key))
+    if not candidates and _contains(text, 'on average'):
+        return 'mean'
+    return max(candidates)[1] if candidates else None
+
+
+def _find_metrics(text):
+    """Return the metric columns mentioned in the question, in order of appearance."""
+    found = []
+    for col, (phrases, _) in METRICS.items():
+        positions = [m.start() for p in phrases for m in re.finditer(r'\b' + re.escape(p) + r'\b', text)]
+        if positions:
+            found.append((min(positions), col))
+    return [col for _, col in sorted(found)]
+
+
+def _find_group(text, exclude=()):
+    for col, phrases in GROUP_COLUMNS.items():
+        if col in exclude:
+            continue
+        for p in phrases:
+            if re.search(r'\b(?:which|what|per|by|each|every|across)\s+' + re.escape(p) + r'\b', text):
+                return col
+    return None
+
+
+def _find_count_subject(text):
+    """Column counted by "how many suppliers ..."; None when products (rows) are counted."""
+    for col, phrases in GROUP_COLUMNS.items():
+        if col == 'Product Name_y':
+            continue
+        for p in phrases:
+            if re.search(r'\b(?:how many|number of|count of)\s+(?:distinct\s+|unique\s+|different\s+)?'
+                         + re.escape(p) + r'\b', text):
+                return col
+    return None
+
+
+def _find_filters(df, text):
+    """Match categorical values mentioned in the question, e.g. 'Europe' -> Region == 'Europe'."""
+    filters = {}
+    for col in FILTER_COLUMNS:
+        if col not in df.columns:
+            continue
+        for value in df[col].dropna().unique():
+            value_str = str(value)
+            if value_str != 'Unknown' and _contains(text, value_str.lower()):
+                filters.setdefault(col, []).append(value)
+    return filters
+
+
+def _status_filter(text):
+    """'compliant' / 'non-compliant' used as an adjective filters on Compliance Status."""
+    if re.search(r'\bnon[- ]?compliant\b', text):
+        return 0
+    if _contains(text, 'compliant'):
+        return 1
+    return None
+
+
+def _is_highly_sustainable(text):
+    return re.search(r'\b(?:highly|most|very)\s+sustainable\b', text) is not None
+
+
+def _apply_filters(df, filters, text):
+    mask = pd.Series(True, index=df.index)
+    for col, values in filters.items():
+        mask &= df[col].isin(values)
+    status = _status_filter(text)
+    if status is not None and 'Compliance Status' in df.columns:
+        mask &= df['Compliance Status'] == status
+    if _is_highly_sustainable(text):
+        co2 = df['CO2 Emissions (tons)']
+        efficiency = df['Material Efficiency (%)']
+        mask &= (co2 <= co2.quantile(0.25)) & (efficiency >= efficiency.quantile(0.75))
+    return mask
+
+
+def _describe_filters(filters, text):
+    parts = [f"{col} = {', '.join(map(str, values))}" for col, values in filters.items()]
+    status = _status_filter(text)
+    if status is not None:
+        parts.append('compliant' if status == 1 else 'non-compliant')
+    if _is_highly_sustainable(text):
+        parts.append('highly sustainable (CO2 in bottom quartile, material efficiency in top quartile)')
+    return '; '.join(parts) if parts else 'all products'
+
+
+def _format_value(col, value):
+    if col == 'Compliance Status':
+        return f"{value:.1%} compliant"
+    return f"{value:,.2f}"
+
+
+def _result(answer, intent, query, data=None):
+    return {
+        "answer": answer,
+        "sources": [{"engine": "dataframe", "intent": intent, "query": query}],
+        "data": data,
+    }
+
+
+def _answer_relationship(df, text, metrics):
+    """Correlation between two numeric columns, or group means for a categorical one."""
+    group = _first_match(text, [(col, phrases) for col, phrases in GROUP_COLUMNS.items()
+                                if col not in ('Product Name_y',)])
+    if len(metrics) >= 2:
+        a, b = metrics[:2]
+        corr = df[a].corr(df[b])
+        return _result(f"Pearson correlation between {a} and {b} is {corr:.3f} (n={df[[a, b]].dropna().shape[0]}).",
+                       'correlation', f"df[['{a}', '{b}']].corr()", corr)
+    if len(metrics) == 1 and group is not None:
+        metric = metrics[0]
+        stats = df.groupby(group, observed=True)[metric].agg(['mean', 'count']).sort_values('mean')
+        lines = ', '.join(f"{idx}: {_format_value(metric, row['mean'])} (n={int(row['count'])})"
+                          for idx, row in stats.iterrows())
+        return _result(f"Average {metric} by {group}: {lines}.", 'correlation',
+                       f"df.groupby('{group}')['{metric}'].mean()", stats)
+    return None
+
+
+def _answer_ranking(df, text, metric, group, filters):
+    sub = df[_apply_filters(df, filters, text)]
+    if sub.empty:
+        return _result(f"No products match the filter ({_describe_filters(filters, text)}).", 'ranking', None)
+
+    higher_is_better = METRICS[metric][1]
+    if any(_contains(text, w) for w in RANK_GOOD):
+        pick_max = higher_is_better
+    elif any(_contains(text, w) for w in RANK_BAD):
+        pick_max = not higher_is_better
+    elif any(_contains(text, w) for w in RANK_LOW):
+        pick_max = False
+    else:
+        pick_max = True
+
+    stats = sub.groupby(group, observed=True)[metric].agg(['mean', 'count'])
+    stats = stats.sort_values('mean', ascending=not pick_max)
+    top = stats.index[0]
+    ranking = ', '.join(f"{idx}: {_format_value(metric, row['mean'])}" for idx, row in stats.iterrows())
+    answer = f"{top} ({_format_value(metric, stats.iloc[0]['mean'])}, n={int(stats.iloc[0]['count'])}). Full ranking: {ranking}."
+    return _result(answer, 'ranking', f"df.groupby('{group}')['{metric}'].mean()", stats)
+
+
+def _answer_aggregate(df, text, metric, agg, group, filters):
+    sub = df[_apply_filters(df, filters, text)]
+    where = _describe_filters(filters, text)
+    if sub.empty:
+        return _result(f"No products match the filter ({where}).", 'aggregate', None)
+
+    if group is not None:
+        stats = sub.groupby(group, observed=True)[metric].agg(agg).sort_values(ascending=False)
+        lines = ', '.join(f"{idx}: {_format_value(metric, value)}" for idx, value in stats.items())
+        return _result(f"{agg.capitalize()} {metric} by {group} ({where}): {lines}.", 'aggregate',
+                       f"df.groupby('{group}')['{metric}'].{agg}()", stats)
+
+    value = sub[metric].agg(agg)
+    return _result(f"The {agg} {metric} for {where} is {_format_value(metric, value)} (n={len(sub)}).",
+                   'aggregate', f"df['{metric}'].{agg}()", value)
+
+
+def _answer_filter(df, text, filters):
+    mask = _apply_filters(df, filters, text)
+    matches = df[mask]
+    where = _describe_filters(filters, text)
+    if matches.empty:
+        return _result(f"No products match ({where}).", 'filter', None, matches)
+    cols = [c for c in ['Product Name_y', 'Supplier Name', 'Region', 'CO2 Emissions (tons)',
+                        'Material Efficiency (%)'] if c in df.columns]
+    preview = '; '.join(', '.join(str(v) for v in row) for row in matches[cols].head(5).itertuples(index=False))
+    # Only a yes/no question ("are there any ...") gets a "Yes"
+    prefix = "Yes, " if re.search(r'\b(?:are|is) there any\b', text) else ""
+    return _result(f"{prefix}{len(matches)} of {len(df)} products match ({where}). For example: {preview}.",
+                   'filter', f"df[{where}]", matches)
+
+
+def route_question(df, question):
+    """Answer aggregate, filter and ranking questions directly from the DataFrame.
+
+    Returns a dict shaped like ``answer_question`` output, or None when the
+    question is free text and should go to the LLM.
+    """
+    text = question.lower().strip()
+    metrics = _find_metrics(text)
+    filters = _find_filters(df, text)
+
+    # Relationship / correlation questions
+    if re.search(r'\b(?:relationship|correlat\w*|relate[sd]?)\b', text):
+        return _answer_relationship(df, text, metrics)
+
+    # "How many ..." counts, optionally grouped
+    if re.search(r'\b(?:how many|number of|count of)\b', text) and not metrics:
+        sub = df[_apply_filters(df, filters, text)]
+        where = _describe_filters(filters, text)
+        subject = _find_count_subject(text)
+        group = _find_group(text, exclude=(subject,))
+        if subject is not None:
+            # "How many suppliers ..." counts distinct suppliers, not their products
+            if group is not None and group != 'Product Name_y':
+                counts = sub.groupby(group, observed=True)[subject].nunique().sort_values(ascending=False)
+                lines = ', '.join(f"{idx}: {n}" for idx, n in counts.items())
+                return _result(f"Distinct {subject} values by {group} ({where}): {lines}.", 'aggregate',
+                               f"df.groupby('{group}')['{subject}'].nunique()", counts)
+            n = sub[subject].nunique()
+            return _result(f"{n} distinct {subject} values ({where}).", 'aggregate',
+                           f"df['{subject}'].nunique()", n)
+        if group is not None and group != 'Product Name_y':
+            counts = sub[group].value_counts()
+            lines = ', '.join(f"{idx}: {n}" for idx, n in counts.items())
+            return _result(f"Product counts by {group} ({where}): {lines}.", 'aggregate',
+                           f"df['{group}'].value_counts()", counts)
+        return _result(f"{len(sub)} products match ({where}).", 'aggregate', "len(df)", len(sub))
+
+    agg = _find_aggregation(text)
+    group = _find_group(text, exclude=filters.keys())
+    is_ranking = any(_contains(text, w) for w in RANK_HIGH + RANK_LOW + RANK_GOOD + RANK_BAD)
+
+    if metrics and group is not None and group != 'Product Name_y' and is_ranking:
+        return _answer_ranking(df, text, metrics[0], group, filters)
+    if metrics and agg is not None:
+        return _answer_aggregate(df, text, metrics[0], agg, group, filters)
+    if metrics and group is not None and is_ranking:
+        return _answer_ranking(df, text, metrics[0], group, filters)
+    if (not metrics and group is not None and group != 'Product Name_y'
+            and any(_contains(text, w) for w in RANK_HIGH + RANK_LOW)):
+        # "Which region has the most non-compliant products?" -> rank by row count. Without a
+        # metric, "best"/"worst" has no measurable meaning, so those questions go to the LLM
+        counts = df[_apply_filters(df, filters, text)][group].value_counts(ascending=any(_contains(text, w) for w in RANK_LOW))
+        if counts.empty:
+            return _result(f"No products match ({_describe_filters(filters, text)}).", 'ranking', None)
+        ranking = ', '.join(f"{idx}: {n}" for idx, n in counts.items())
+        return _result(f"{counts.index[0]} ({counts.iloc[0]} products). Full ranking: {ranking}.", 'ranking',
+                       f"df['{group}'].value_counts()", counts)
+
+    # "Are there any products that are ..." / "list products ..."
+    if re.search(r'\b(?:are there any|is there any|list|show|which products)\b', text):
+        if filters or re.search(r'\b(?:compliant|sustainable)\b', text):
+            return _answer_filter(df, text, filters)
+
+    return None
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import pandas as pd
+
+SUSTAINABILITY_COLS = ['CO2 Emissions (tons)', 'Energy Usage (kWh)', 'Material Efficiency (%)']
+COMPLIANCE_CORR_COLS = SUSTAINABILITY_COLS + ['Carbon Footprint (tons)', 'Energy Efficiency']
+
+# In-process cache: data version -> statistics dict
+_STATS_CACHE = {}
+
+
+def data_version(df):
+    """Content hash of the DataFrame, used to key cached statistics."""
+    row_hashes = pd.util.hash_pandas_object(df, index=True).values
+    digest = hashlib.sha1(row_hashes.tobytes())
+    digest.update(','.join(map(str, df.columns)).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def _rate_table(grouped):
+    return {str(k): {"compliance_rate": round(float(v['mean']), 4), "count": int(v['count'])}
+            for k, v in grouped.iterrows()}
+
+
+def compute_report_stats(df):
+    """Compute every statistic the compliance and sustainability reports ask for."""
+    status = df['Compliance Status'].astype(float)
+
+    # Sustainability score: low CO2 and energy use, high material efficiency
+    z = (df[SUSTAINABILITY_COLS] - df[SUSTAINABILITY_COLS].mean()) / df[SUSTAINABILITY_COLS].std(ddof=0)
+    score = z['Material Efficiency (%)'] - z['CO2 Emissions (tons)'] - z['Energy Usage (kWh)']
+    ranked = df.assign(_score=score).sort_values('_score', ascending=False)
+    id_cols = [c for c in ['Product Name_y', 'Supplier Name', 'Region'] if c in df.columns]
+
+    def product_rows(rows):
+        return [{**{c: str(r[c]) for c in id_cols},
+                 **{c: round(float(r[c]), 2) for c in SUSTAINABILITY_COLS},
+                 "score": round(float(r['_score']), 2)} for _, r in rows.iterrows()]
+
+    compliance_corr = df[COMPLIANCE_CORR_COLS].corrwith(status)
+    by_region = df.groupby('Region', observed=True)
+
+    return {
+        "rows": int(len(df)),
+        "compliance": {
+            "compliance_rate": round(float(status.mean()), 4),
+            "audit_approved_rate": round(float(df['Audit Status'].mean()), 4) if 'Audit Status' in df else None,
+            "hazard_counts": {str(k): int(v) for k, v in df['Hazard Classification'].value_counts().items()},
+            "by_region": _rate_table(by_region['Compliance Status'].agg(['mean', 'count'])),
+            "by_category": _rate_table(df.groupby('Category', observed=True)['Compliance Status']
+                                       .agg(['mean', 'count']).sort_values('mean')),
+            "by_hazard": _rate_table(df.groupby('Hazard Classification', observed=True)['Compliance Status']
+                                     .agg(['mean', 'count'])),
+            "by_supplier": _rate_table(df.groupby('Supplier Name', observed=True)['Compliance Status']
+                                       .agg(['mean', 'count']).sort_values('mean')),
+            "correlation_with_sustainability": {k: round(float(v), 3) for k, v in compliance_corr.items()},
+        },
+        "sustainability": {
+            "distribution": {col: {k: round(float(v), 2) for k, v in desc.items()}
+                             for col, desc in df[SUSTAINABILITY_COLS].describe().drop('count').items()},
+            "correlations": {f"{a} vs {b}": round(float(df[a].corr(df[b])), 3)
+                             for i, a in enumerate(SUSTAINABILITY_COLS) for b in SUSTAINABILITY_COLS[i + 1:]},
+            "by_region": {str(k): {c: round(float(v), 2) for c, v in row.items()}
+                          for k, row in by_region[SUSTAINABILITY_COLS].mean().iterrows()},
+            "best_products": product_rows(ranked.head(3)),
+            "worst_products": product_rows(ranked.tail(3).iloc[::-1]),
+        },
+    }
+
+
+def get_report_stats(df, cache_dir='report_cache'):
+    """Return cached statistics for this version of the data, computing them on a miss."""
+    version = data_version(df)
+    if version in _STATS_CACHE:
+        return _STATS_CACHE[version]
+
+    cache_path = os.path.join(cache_dir, f'report_stats_{version}.json') if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+    else:
+        stats = compute_report_stats(df)
+        stats['data_version'] = version
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(stats, f, indent=2)
+
+    _STATS_CACHE[version] = stats
+    return stats
+
+
+def _pct(value):
+    return f"{value:.1%}"
+
+
+def format_report_summary(stats, report_type):
+    """Render the statistics as a compact text block for the LLM prompt."""
+    lines = [f"Dataset: {stats['rows']} products (data version {stats['data_version']})."]
+    if report_type == "compliance":
+        c = stats['compliance']
+        lines.append(f"Overall compliance: {_pct(c['compliance_rate'])} compliant.")
+        if c['audit_approved_rate'] is not None:
+            lines.append(f"Audits approved: {_pct(c['audit_approved_rate'])}.")
+        lines.append("Hazard classifications: " + ', '.join(f"{k} {v}" for k, v in c['hazard_counts'].items()) + ".")
+        lines.append("Compliance by region: " + ', '.join(
+            f"{k} {_pct(v['compliance_rate'])} (n={v['count']})" for k, v in c['by_region'].items()) + ".")
+        lines.append("Compliance by category (lowest first): " + ', '.join(
+            f"{k} {_pct(v['compliance_rate'])}" for k, v in c['by_category'].items()) + ".")
+        lines.append("Compliance by supplier (lowest first): " + ', '.join(
+            f"{k} {_pct(v['compliance_rate'])}" for k, v in c['by_supplier'].items()) + ".")
+        lines.append("Correlation of compliance with sustainability metrics: " + ', '.join(
+            f"{k} {v:+.2f}" for k, v in c['correlation_with_sustainability'].items()) + ".")
+    else:
+        s = stats['sustainability']
+        for col, d in s['distribution'].items():
+            lines.append(f"{col}: mean {d['mean']}, std {d['std']}, min {d['min']}, median {d['50%']}, max {d['max']}.")
+        lines.append("Correlations: " + ', '.join(f"{k} {v:+.2f}" for k, v in s['correlations'].items()) + ".")
+        lines.append("Regional means: " + '; '.join(
+            f"{k}: " + ', '.join(f"{c.split(' (')[0]} {v}" for c, v in row.items())
+            for k, row in s['by_region'].items()) + ".")
+        for label, key in (("Best", 'best_products'), ("Worst", 'worst_products')):
+            lines.append(f"{label} sustainability scores: " + '; '.join(
+                f"{p.get('Product Name_y', '?')} from {p.get('Supplier Name', '?')} ({p.get('Region', '?')}) score {p['score']}"
+                for p in s[key]) + ".")
+    return '\n'.join(lines)
@@ -0,0 +1,49 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("langchain.llms.base")
+
+import fast_llm
+from fast_llm import BatchedGenerator, BatchedSeq2SeqLLM
+
+
+class CountingGenerator(BatchedGenerator):
+    """BatchedGenerator without a model: counts batched generate calls"""
+
+    def __init__(self, **kwargs):
+        self.calls = 0
+        self._lock = threading.Lock()
+        super().__init__(warmup=False, **kwargs)
+
+    def generate(self, prompts, return_token_counts=False):
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.05)
+        return [prompt.upper() for prompt in prompts]
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    monkeypatch.setattr(fast_llm, "load_seq2seq_model", lambda *args, **kwargs: (None, None))
+    return CountingGenerator(max_batch_size=8, max_wait_ms=50)
+
+
+def test_concurrent_invokes_are_coalesced(generator):
+    llm = BatchedSeq2SeqLLM(generator=generator)
+    prompts = [f"question {i}" for i in range(8)]
+    with ThreadPoolExecutor(max_workers=len(prompts)) as pool:
+        answers = list(pool.map(llm.invoke, prompts))
+    assert answers == [prompt.upper() for prompt in prompts]
+    assert generator.calls < len(prompts)
+
+
+def test_batch_is_coalesced(generator):
+    llm = BatchedSeq2SeqLLM(generator=generator)
+    prompts = [f"question {i}" for i in range(8)]
+    assert llm.batch(prompts) == [prompt.upper() for prompt in prompts]
+    assert generator.calls < len(prompts)
@@ -0,0 +1,64 @@
+import os
+
+import pandas as pd
+import pytest
+
+from query_router import route_question
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), 'preprocessed_data.csv')
+
+
+@pytest.fixture(scope='module')
+def df():
+    return pd.read_csv(DATA_PATH)
+
+
+@pytest.mark.parametrize("question", [
+    "What does compliance mean for toxic products?",
+    "What does a low energy efficiency mean?",
+])
+def test_bare_aggregation_word_goes_to_llm(df, question):
+    assert route_question(df, question) is None
+
+
+@pytest.mark.parametrize("question, agg", [
+    ("What is the average CO2 emissions for products from Europe?", "mean"),
+    ("What is the median lead time?", "median"),
+    ("Total energy usage by region", "sum"),
+    ("CO2 emissions on average for products from Asia", "mean"),
+])
+def test_aggregation_phrase_goes_to_pandas(df, question, agg):
+    result = route_question(df, question)
+    assert result is not None
+    assert result["sources"][0]["intent"] == "aggregate"
+    assert f".{agg}()" in result["sources"][0]["query"]
+
+
+@pytest.mark.parametrize("question", [
+    "Which supplier is the worst?",
+    "Which region is the best for sourcing?",
+])
+def test_best_or_worst_without_metric_goes_to_llm(df, question):
+    assert route_question(df, question) is None
+
+
+def test_most_without_metric_ranks_by_count(df):
+    result = route_question(df, "Which region has the most non-compliant products?")
+    assert result["sources"][0]["intent"] == "ranking"
+    assert result["sources"][0]["query"] == "df['Region'].value_counts()"
+
+
+def test_how_many_suppliers_counts_distinct_suppliers(df):
+    result = route_question(df, "How many suppliers are in Asia?")
+    assert result["data"] == df.loc[df['Region'] == 'Asia', 'Supplier Name'].nunique()
+    assert result["sources"][0]["query"] == "df['Supplier Name'].nunique()"
+
+
+def test_how_many_products_counts_rows(df):
+    result = route_question(df, "How many products are from Asia?")
+    assert result["data"] == (df['Region'] == 'Asia').sum()
+
+
+def test_only_yes_no_filter_questions_answer_yes(df):
+    assert not route_question(df, "List the risks of flammable products")["answer"].startswith("Yes")
+    assert route_question(df, "Are there any non-compliant products from Europe?")["answer"].startswith("Yes")
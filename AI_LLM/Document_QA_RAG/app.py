@@ -1,4 +1,5 @@
 import os
+import sys
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -8,15 +9,16 @@ from langchain_groq import ChatGroq
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.embeddings import OllamaEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.chains import create_retrieval_chain
-from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import PyPDFDirectoryLoader
-from langchain_community.retrievers import BM25Retriever
-from langchain.retrievers import EnsembleRetriever
 
-from ranker import rerank_documents
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),os.pardir))  # AI_LLM/, for rag_common
+from rag_common.answer_cache import AnswerCache
+from ranker import warm_up_reranker
+from hybrid_retriever import HybridRetriever
+from rag_pipeline import PROMPT_TEMPLATE, retrieve, rerank, assemble_prompt, stream_answer
+from tracing import QueryTrace, TraceStore
+from vector_store import INDEX_DIR, load_manifest, load_vector_index, load_keyword_retriever, sync_index
 
 
 ##load the API KEYS
@@ -29,41 +31,66 @@ groq_api_key=os.getenv("GROQ_API_KEY")
 llm=ChatGroq(groq_api_key=groq_api_key,model_name="Llama3-8b-8192")
 
 ## creating the prompt template
-prompt=ChatPromptTemplate.from_template(
-    """
-    Answer the questions based on the provided context only.
-    Please provide the most accurate response based on the question
-    <context>
-    {context}
-    Question:{input}
-    """
-)
+prompt=ChatPromptTemplate.from_template(PROMPT_TEMPLATE)
+
+## load the reranker in the background so the first page renders immediately
+warm_up_reranker()
+
+## per-query latency traces, aggregated across sessions and appended to traces.jsonl
+@st.cache_resource
+def get_trace_store():
+    return TraceStore("traces.jsonl")
+
+## embeddings client shared by every session
+@st.cache_resource
+def get_embeddings():
+    return OpenAIEmbeddings()
+
+## one answer cache per index version, shared by the sessions on that version;
+## sessions on different versions never touch each other's cache or embedder
+@st.cache_resource(max_entries=4)
+def get_answer_cache(index_version):
+    return AnswerCache(embed_fn=get_embeddings().embed_query,index_version=index_version,
+                       similarity_threshold=0.95,ttl_seconds=3600,max_entries=1024)
+
+## persisted index, memory-mapped once per process and shared by every session
+@st.cache_resource
+def load_shared_index(index_version):
+    vectors=load_vector_index(get_embeddings(),INDEX_DIR)
+    keyword_retriever=load_keyword_retriever(INDEX_DIR)
+    return vectors,keyword_retriever
+
+def use_index(manifest):
+    st.session_state.embeddings=get_embeddings()
+    st.session_state.vectors,st.session_state.keyword_retriever=load_shared_index(manifest["version"])
+    # Index version: cached answers are only valid for this exact set of PDFs
+    st.session_state.index_version=manifest["version"]
+
 ## setting up vectors embedding
 def create_vector_embedding():
-    if "vectors" not in st.session_state:
-        
-        st.session_state.vectors=None
-        # Step 1: Initiaze OpenAI Embeddings
-        st.session_state.embeddings=OpenAIEmbeddings()
-
-        #Step 2 Load PDF Documents from folder
-        st.session_state.loader=PyPDFDirectoryLoader("research_paper") ## Data Ingestion Step
-        st.session_state.docs=st.session_state.loader.load()
+    # Step 1: Initiaze OpenAI Embeddings
+    embeddings=get_embeddings()
 
-        #Step 3: Split Documents into chunks
-        st.session_state.text_splitter=RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200)
+    # Step 2: Split Documents into chunks
+    text_splitter=RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=200)
 
-        docs_to_split = st.session_state.docs[:50] if len(st.session_state.docs) >= 50 else st.session_state.docs
-        st.session_state.final_documents=st.session_state.text_splitter.split_documents(docs_to_split)
+    # Step 3: Sync the persisted FAISS + BM25 index with research_paper/
+    # Only new or changed PDFs are streamed page by page and embedded in batches
+    progress_bar=st.progress(0.0,text="Checking research_paper/ for new or changed PDFs")
+    def show_progress(done,total,message):
+        progress_bar.progress(min(done/total,1.0) if total else 1.0,text=f"{message} ({done}/{total} pages)")
 
-        # Step 4: Create FAISS vector store
-        st.session_state.vectors=FAISS.from_documents(
-            st.session_state.final_documents,
-            st.session_state.embeddings)
+    manifest,_=sync_index("research_paper",embeddings,text_splitter,INDEX_DIR,
+                          batch_size=64,max_concurrency=4,progress=show_progress)
+    progress_bar.empty()
+    use_index(manifest)
 
 
+# Reuse an index built by an earlier session or another worker process
+if "vectors" not in st.session_state and load_manifest(INDEX_DIR)["version"] is not None:
+    use_index(load_manifest(INDEX_DIR))
 
 st.title("RAG Document Q&A With Groq and Llama 3")
 
@@ -74,51 +101,54 @@ if st.button("Document Embedding"):
     st.write("Vector Database is Ready")
 
 
-import time
-
 if user_prompt:
     if "vectors" not in st.session_state or st.session_state.vectors is None:
         st.error("Please create the vector database first by clicking the 'Document Embedding' button.")
     else:
-        # Step 1: Retrieve Documents (Raw from Retriever)
-       
-        #Create a BM25 retriever
-        keyword_retriever=BM25Retriever.from_documents(st.session_state.final_documents)
-        #Create a vector retriver
-        vector_retriever = st.session_state.vectors.as_retriever(search_kwargs={"k":5})
-        #Combine both with weights
-        hybrid_retrievers=EnsembleRetriever(
-            retrievers=[vector_retriever,keyword_retriever],
-            weights=[0.5,0.5]
-        )
-
-        retrieved_docs=hybrid_retrievers.get_relevant_documents(user_prompt)
-
-        # Step 2: Rerank the retrieved docs
-        reranked_docs=rerank_documents(user_prompt,retrieved_docs,top_n=3)
-        #retrieval_chain = create_retrieval_chain(retriever, document_chain)
-
-        # Step 3: Run the reranked docs through the document chain
-        start = time.process_time()
-        
-       #context_text = "\n\n".join([doc.page_content for doc in reranked_docs])
-
-        document_chain=create_stuff_documents_chain(llm,prompt)
-        response=document_chain.invoke({
-            "context":reranked_docs,
-            "input":user_prompt
-        })
-
-        #response = retrieval_chain.invoke({'input': user_prompt})
-        print(f"Response time :{time.process_time() - start}")
-
-        if isinstance(response,dict):
-            final_answer=response.get('output_text',str(response))
-        else:
-            final_answer=str(response)
+        answer_cache=get_answer_cache(st.session_state.index_version)
 
         st.subheader("Answer")
-        st.write(final_answer)
+
+        # Step 0: Serve repeated or near-duplicate questions from the cache
+        cached=answer_cache.get(user_prompt)
+        if cached is not None:
+            final_answer=cached["answer"]
+            retrieved_docs=cached["retrieved_docs"]
+            reranked_docs=cached["reranked_docs"]
+            st.write(final_answer)
+            st.caption("Served from answer cache")
+        else:
+            trace=QueryTrace(user_prompt)
+
+            # Step 1: Retrieve Documents
+            #Vector (k=5) and BM25 searches run concurrently, fused with weighted RRF,
+            #de-duplicated by chunk id and capped before reranking
+            hybrid_retrievers=HybridRetriever(
+                vector_store=st.session_state.vectors,
+                keyword_retriever=st.session_state.keyword_retriever,
+                vector_k=5,
+                keyword_k=5,
+                weights=[0.5,0.5],
+                max_candidates=6
+            )
+            retrieved_docs=retrieve(hybrid_retrievers,user_prompt,trace)
+
+            # Step 2: Rerank the retrieved docs
+            reranked_docs=rerank(user_prompt,retrieved_docs,trace,top_n=3)
+
+            # Step 3: Stream the answer from the LLM token by token
+            messages=assemble_prompt(prompt,user_prompt,reranked_docs,trace)
+            final_answer=st.write_stream(stream_answer(llm,messages,trace))
+
+            get_trace_store().add(trace.finish())
+            with st.expander("Latency breakdown (wall clock)"):
+                st.table({"stage":list(trace.stage_ms()),
+                          "ms":[round(ms,1) for ms in trace.stage_ms().values()]})
+
+            answer_cache.put(user_prompt,{
+                "answer":final_answer,
+                "retrieved_docs":retrieved_docs,
+                "reranked_docs":reranked_docs})
 
         st.subheader("Comparison: Without vs With Reranking")
 
@@ -139,16 +169,11 @@ if user_prompt:
                  st.write(doc.page_content[:300] + "...")
                  st.write(f"Rerank Score: {doc.metadata.get('rerank_score','N/A')}")
                  st.write("---")
-                         
-
-
-
-
-
-
-
-
-
-
 
+        st.sidebar.subheader("Answer cache")
+        st.sidebar.json(answer_cache.stats())
 
+        st.sidebar.subheader("Latency (all queries)")
+        st.sidebar.dataframe(get_trace_store().summary())
+        with open(get_trace_store().export_csv("traces.csv"),"rb") as f:
+            st.sidebar.download_button("Export traces (CSV)",data=f.read(),file_name="traces.csv")
@@ -0,0 +1,100 @@
+"""Latency benchmark: current fp16/device_map reranker vs the CPU-first RerankerBackend.
+
+Scores the same (query, chunk) candidate sets from research_paper/ with each
+configuration, sequentially and with concurrent users:
+
+    python benchmark_reranker.py --queries 24 --candidates 6 --users 4
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+from langchain_community.document_loaders import PyPDFDirectoryLoader
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from reranker_backend import RerankerBackend
+
+MODEL_NAME="BAAI/bge-reranker-base"
+QUERIES=[
+    "What is scaled dot-product attention?",
+    "Why does the Transformer use multi-head attention?",
+    "How are positional encodings computed?",
+    "What training data was used for the language models?",
+    "How are large language models evaluated?",
+    "What are the limitations of large language models?",
+]
+
+
+def load_candidates(n_queries,n_candidates):
+    pages=PyPDFDirectoryLoader("research_paper").load()
+    chunks=RecursiveCharacterTextSplitter(chunk_size=1000,chunk_overlap=200).split_documents(pages)
+    rng=np.random.default_rng(0)
+    return [(QUERIES[i%len(QUERIES)],[chunks[j].page_content for j in rng.choice(len(chunks),n_candidates,replace=False)])
+            for i in range(n_queries)]
+
+
+def current_implementation():
+    """The original ranker.py: fp16 weights, device_map="auto", padding=True up to 512 tokens"""
+    model=AutoModelForSequenceClassification.from_pretrained(MODEL_NAME,device_map="auto",torch_dtype=torch.float16)
+    tokenizer=AutoTokenizer.from_pretrained(MODEL_NAME)
+
+    def score(query,texts):
+        inputs=tokenizer([(query,t) for t in texts],padding=True,truncation=True,return_tensors="pt",max_length=512)
+        with torch.no_grad():
+            return model(**inputs).logits.squeeze(-1).tolist()
+    return score
+
+
+def run(score,requests,users):
+    def one(request):
+        start=time.perf_counter()
+        score(*request)
+        return time.perf_counter()-start
+
+    score(*requests[0])  # warm-up
+    start=time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        latencies=np.array(list(pool.map(one,requests)))*1000
+    wall=time.perf_counter()-start
+    return np.percentile(latencies,50),np.percentile(latencies,95),len(requests)/wall
+
+
+def main():
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries",type=int,default=24)
+    parser.add_argument("--candidates",type=int,default=6)
+    parser.add_argument("--users",type=int,default=4)
+    args=parser.parse_args()
+
+    requests=load_candidates(args.queries,args.candidates)
+    configs=[("current fp16 (padding=True, 512)",None)]
+    for quantize in (False,True):
+        for max_length in (512,256):
+            configs.append((f"{'int8' if quantize else 'fp32'} bucketed, max_length={max_length}",
+                            dict(quantize=quantize,max_length=max_length)))
+
+    print(f"{'configuration':<40} {'users':>5} {'p50 ms':>9} {'p95 ms':>9} {'queries/s':>10}")
+    for name,kwargs in configs:
+        try:
+            if kwargs is None:
+                score=current_implementation()
+            else:
+                backend=RerankerBackend(MODEL_NAME,device="cpu",**kwargs)
+                score=lambda query,texts,backend=backend:backend.score([(query,t) for t in texts])
+        except (RuntimeError,ValueError) as exc:
+            print(f"{name:<40} unavailable on this host: {exc}")
+            continue
+        for users in sorted({1,args.users}):
+            try:
+                p50,p95,qps=run(score,requests,users)
+            except RuntimeError as exc:  # e.g. fp16 kernels missing on CPU
+                print(f"{name:<40} {users:>5} failed: {exc}")
+                break
+            print(f"{name:<40} {users:>5} {p50:>9.0f} {p95:>9.0f} {qps:>10.2f}")
+
+
+if __name__=="__main__":
+    main()
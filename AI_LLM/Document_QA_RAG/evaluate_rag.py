@@ -0,0 +1,225 @@
+"""Offline evaluation and load test for the retrieval -> rerank -> generate path.
+
+Runs the same pipeline as app.py (HybridRetriever, rerank_documents, the stuff
+prompt and a streamed answer) headlessly over research_paper/*.pdf. ChatGroq
+and OpenAIEmbeddings are replaced by local stand-ins, so no API keys are
+needed and runs are reproducible:
+
+* HashingEmbeddings: deterministic feature-hashed unigram/bigram vectors
+* StubChatModel: streams an extract of the context with configurable delays
+
+A retrieved chunk counts as relevant when it contains one of the question's
+expected substrings (eval_questions.json). Reports recall@k and MRR for the
+fused candidates and the reranked top_n, per-stage latency (p50/p95) and QPS
+for each level of concurrent users:
+
+    python evaluate_rag.py --chunk-size 1000 --chunk-overlap 200 --top-n 3 --users 1 4 8
+    python evaluate_rag.py --weights 0.7 0.3 --max-candidates 10 --output results.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.prompts import ChatPromptTemplate
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from hybrid_retriever import HybridRetriever
+from rag_pipeline import PROMPT_TEMPLATE, CONTEXT_TOKEN_BUDGET, retrieve, rerank, assemble_prompt, stream_answer
+from sparse_index import tokenize
+from tracing import QueryTrace, TraceStore
+from vector_store import sync_index, load_vector_index, load_keyword_retriever
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic local embeddings: signed feature hashing of unigrams and bigrams, L2-normalized"""
+
+    def __init__(self, dim=512):
+        self.dim = dim
+
+    def _embed(self, text):
+        tokens = tokenize(text)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[digest % self.dim] += 1.0 if (digest >> 63) else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+class StubChatModel:
+    """Stands in for ChatGroq.stream: answers with the first words of the context.
+
+    first_token_ms and token_ms simulate time to first token and decode speed.
+    """
+
+    def __init__(self, max_tokens=64, first_token_ms=0.0, token_ms=0.0):
+        self.max_tokens = max_tokens
+        self.first_token_delay = first_token_ms / 1000.0
+        self.token_delay = token_ms / 1000.0
+
+    def stream(self, messages):
+        text = messages[-1].content
+        match = re.search(r"<context>(.*)Question:", text, re.S)
+        words = (match.group(1) if match else text).split()[:self.max_tokens]
+        time.sleep(self.first_token_delay)
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(self.token_delay)
+            yield word + " "
+
+
+def normalize(text):
+    return " ".join(text.split()).lower()
+
+
+def first_relevant_rank(docs, expected):
+    """1-based rank of the first chunk containing an expected substring, or None"""
+    expected = [normalize(e) for e in expected]
+    for rank, doc in enumerate(docs, start=1):
+        content = normalize(doc.page_content)
+        if any(e in content for e in expected):
+            return rank
+    return None
+
+
+def build_retriever(args, embeddings):
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    # One index per chunking/embedding configuration so sweeps don't rebuild each other's index
+    index_dir = os.path.join(args.index_root, f"hash{embeddings.dim}_cs{args.chunk_size}_ov{args.chunk_overlap}")
+    os.makedirs(args.index_root, exist_ok=True)
+    start = time.perf_counter()
+    manifest, changed = sync_index(args.pdf_dir, embeddings, text_splitter, index_dir)
+    chunks = sum(len(entry["chunk_ids"]) for entry in manifest["files"].values())
+    print(f"index {index_dir}: {chunks} chunks ({'built' if changed else 'reused'} in {time.perf_counter() - start:.1f}s)")
+    return HybridRetriever(
+        vector_store=load_vector_index(embeddings, index_dir),
+        keyword_retriever=load_keyword_retriever(index_dir),
+        vector_k=args.vector_k,
+        keyword_k=args.keyword_k,
+        weights=args.weights,
+        max_candidates=args.max_candidates,
+    )
+
+
+def run_query(retriever, prompt, llm, question, args):
+    """One pass of the app.py pipeline; returns (trace, fused candidates, final context docs)"""
+    trace = QueryTrace(question)
+    candidates = retrieve(retriever, question, trace)
+    if args.no_rerank:
+        final_docs = candidates[:args.top_n]
+    else:
+        final_docs = rerank(question, candidates, trace, top_n=args.top_n)
+    messages = assemble_prompt(prompt, question, final_docs, trace, args.context_tokens)
+    "".join(stream_answer(llm, messages, trace))
+    return trace.finish(), candidates, final_docs
+
+
+def evaluate_quality(retriever, prompt, llm, questions, args):
+    ks = sorted({1, 3, 5, args.max_candidates})
+    candidate_ranks, final_ranks, context_tokens = [], [], []
+    for item in questions:
+        trace, candidates, final_docs = run_query(retriever, prompt, llm, item["question"], args)
+        context_tokens.append((trace.attributes["context_tokens"], trace.attributes["context_tokens_unpacked"]))
+        candidate_ranks.append(first_relevant_rank(candidates, item["expected"]))
+        final_ranks.append(first_relevant_rank(final_docs, item["expected"]))
+
+    def recall(ranks, k):
+        return float(np.mean([rank is not None and rank <= k for rank in ranks]))
+
+    def mrr(ranks):
+        return float(np.mean([1.0 / rank if rank else 0.0 for rank in ranks]))
+
+    return {
+        "questions": len(questions),
+        "retrieval": {**{f"recall@{k}": recall(candidate_ranks, k) for k in ks}, "mrr": mrr(candidate_ranks)},
+        "final": {f"recall@{args.top_n}": recall(final_ranks, args.top_n), "mrr": mrr(final_ranks)},
+        "context_tokens_mean": float(np.mean([packed for packed, _ in context_tokens])),
+        "context_tokens_unpacked_mean": float(np.mean([unpacked for _, unpacked in context_tokens])),
+        "misses": [item["question"] for item, rank in zip(questions, final_ranks) if rank is None],
+    }
+
+
+def load_test(retriever, prompt, llm, questions, users, args):
+    """Run every question args.rounds times from `users` concurrent threads"""
+    if not args.no_rerank:
+        from ranker import clear_score_cache
+        clear_score_cache()  # each concurrency level pays for its own reranker calls
+    store = TraceStore(path=None)
+    workload = [item["question"] for item in questions] * args.rounds
+
+    def one(question):
+        store.add(run_query(retriever, prompt, llm, question, args)[0])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(one, workload))
+    wall = time.perf_counter() - start
+    return {"users": users, "queries": len(workload), "qps": len(workload) / wall, "stages": store.summary()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf-dir", default="research_paper")
+    parser.add_argument("--questions", default="eval_questions.json")
+    parser.add_argument("--index-root", default="eval_index")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--vector-k", type=int, default=5)
+    parser.add_argument("--keyword-k", type=int, default=5)
+    parser.add_argument("--weights", type=float, nargs=2, default=[0.5, 0.5], metavar=("VECTOR", "BM25"))
+    parser.add_argument("--max-candidates", type=int, default=6)
+    parser.add_argument("--top-n", type=int, default=3)
+    parser.add_argument("--context-tokens", type=int, default=CONTEXT_TOKEN_BUDGET,
+                        help="token budget for the packed context")
+    parser.add_argument("--no-rerank", action="store_true",
+                        help="skip the cross-encoder and keep the fused order (hosts without the model)")
+    parser.add_argument("--embedding-dim", type=int, default=512)
+    parser.add_argument("--first-token-ms", type=float, default=0.0, help="simulated LLM time to first token")
+    parser.add_argument("--token-ms", type=float, default=0.0, help="simulated LLM time per streamed token")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--rounds", type=int, default=1, help="passes over the question set per load level")
+    parser.add_argument("--output", help="write the full results as JSON")
+    args = parser.parse_args()
+
+    with open(args.questions, encoding="utf-8") as f:
+        questions = json.load(f)
+    embeddings = HashingEmbeddings(args.embedding_dim)
+    retriever = build_retriever(args, embeddings)
+    prompt = ChatPromptTemplate.from_template(PROMPT_TEMPLATE)
+    llm = StubChatModel(first_token_ms=args.first_token_ms, token_ms=args.token_ms)
+
+    quality = evaluate_quality(retriever, prompt, llm, questions, args)
+    print(f"\n{quality['questions']} questions")
+    for name in ("retrieval", "final"):
+        print(f"{name:<10} " + "  ".join(f"{metric}={value:.3f}" for metric, value in quality[name].items()))
+    print(f"context    {quality['context_tokens_mean']:.0f} tokens packed "
+          f"(from {quality['context_tokens_unpacked_mean']:.0f})")
+    for question in quality["misses"]:
+        print(f"  no relevant chunk in top {args.top_n}: {question}")
+
+    load = [load_test(retriever, prompt, llm, questions, users, args) for users in args.users]
+    print(f"\n{'users':>5} {'stage':<20} {'p50 ms':>9} {'p95 ms':>9}")
+    for level in load:
+        for stage, stats in level["stages"].items():
+            print(f"{level['users']:>5} {stage:<20} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f}")
+        print(f"{level['users']:>5} {'QPS':<20} {level['qps']:>9.2f}\n")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "quality": quality, "load": load}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
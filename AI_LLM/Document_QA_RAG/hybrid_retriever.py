@@ -0,0 +1,72 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+# Shared by every query so the vector and keyword searches run side by side
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid-search")
+
+
+def chunk_id(doc):
+    """Stable id for a chunk: its source, page and content"""
+    key = f"{doc.metadata.get('source', '')}|{doc.metadata.get('page', '')}|{doc.page_content}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def reciprocal_rank_fusion(result_lists, weights, c=60, max_candidates=None):
+    """Weighted RRF: score(d) = sum_i w_i / (c + rank_i(d)), de-duplicated by chunk id"""
+    scores, docs = {}, {}
+    for results, weight in zip(result_lists, weights):
+        for rank, doc in enumerate(results, start=1):
+            key = chunk_id(doc)
+            scores[key] = scores.get(key, 0.0) + weight / (c + rank)
+            docs.setdefault(key, doc)
+    ranked = sorted(scores, key=scores.get, reverse=True)[:max_candidates]
+    fused = []
+    for key in ranked:
+        doc = docs[key]
+        fused.append(Document(page_content=doc.page_content,
+                              metadata={**doc.metadata, "chunk_id": key, "fusion_score": scores[key]}))
+    return fused
+
+
+class HybridRetriever(BaseRetriever):
+    """Vector + BM25 retrieval run concurrently and fused with weighted reciprocal rank fusion.
+
+    Duplicate chunks returned by both searches are merged, and at most
+    max_candidates documents are returned so the reranker scores fewer pairs.
+    """
+
+    vector_store: Any
+    keyword_retriever: Any
+    vector_k: int = 5
+    keyword_k: int = 5
+    weights: List[float] = [0.5, 0.5]
+    c: int = 60
+    max_candidates: int = 6
+
+    def search(self, query, trace=None):
+        """Return (vector_docs, keyword_docs) from both searches run concurrently.
+
+        When a QueryTrace is passed, each search records its own wall-clock time.
+        """
+        def timed(name, fn, *args):
+            if trace is None:
+                return fn(*args)
+            with trace.span(name):
+                return fn(*args)
+
+        vector_future = _SEARCH_POOL.submit(timed, "vector_search", self.vector_store.similarity_search,
+                                            query, self.vector_k)
+        keyword_future = _SEARCH_POOL.submit(timed, "bm25_search", self.keyword_retriever.search,
+                                             query, self.keyword_k)
+        return vector_future.result(), keyword_future.result()
+
+    def fuse(self, vector_docs, keyword_docs):
+        return reciprocal_rank_fusion([vector_docs, keyword_docs], self.weights, self.c, self.max_candidates)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.fuse(*self.search(query))
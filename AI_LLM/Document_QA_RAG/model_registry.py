@@ -0,0 +1,48 @@
+import threading
+
+# name -> zero-argument factory, and name -> loaded model
+_factories={}
+_models={}
+_warming=set()
+_lock=threading.Lock()
+
+
+def register(name,factory):
+    """Register how to build a model; nothing is loaded until first use"""
+    _factories[name]=factory
+
+
+def get(name):
+    """Return the model, loading it on first use (at most once per process)"""
+    model=_models.get(name)
+    if model is None:
+        with _lock:
+            model=_models.get(name)
+            if model is None:
+                model=_factories[name]()
+                _models[name]=model
+    return model
+
+
+def is_loaded(name):
+    return name in _models
+
+
+def warm_up_in_background(name):
+    """Load (and warm up, if the model supports it) on a daemon thread so callers don't block.
+
+    Only the first call per name starts a thread; later calls return None.
+    """
+    with _lock:
+        if name in _warming or name in _models:
+            return None
+        _warming.add(name)
+
+    def load():
+        model=get(name)
+        if hasattr(model,"warmup"):
+            model.warmup()
+
+    thread=threading.Thread(target=load,name=f"warmup-{name}",daemon=True)
+    thread.start()
+    return thread
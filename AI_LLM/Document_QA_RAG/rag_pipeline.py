@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),os.pardir))  # AI_LLM/, for rag_common
+from rag_common.context_packer import pack_context
+from ranker import rerank_documents
+
+PROMPT_TEMPLATE="""
+    Answer the questions based on the provided context only.
+    Please provide the most accurate response based on the question
+    <context>
+    {context}
+    Question:{input}
+    """
+
+# Token budget for the retrieved context in the Llama3-8b-8192 prompt
+CONTEXT_TOKEN_BUDGET=1024
+
+
+def retrieve(retriever,query,trace):
+    """Hybrid retrieval; vector and BM25 searches are timed separately, then fusion"""
+    with trace.span("retrieval"):
+        vector_docs,keyword_docs=retriever.search(query,trace)
+    with trace.span("fusion"):
+        return retriever.fuse(vector_docs,keyword_docs)
+
+
+def rerank(query,docs,trace,top_n=3):
+    with trace.span("rerank"):
+        return rerank_documents(query,docs,top_n=top_n)
+
+
+def assemble_prompt(prompt,query,docs,trace,max_context_tokens=CONTEXT_TOKEN_BUDGET):
+    """Pack the chunks into the token budget (best rerank score first, chunk overlap removed)
+    and lay them out like create_stuff_documents_chain: chunks joined by blank lines"""
+    with trace.span("prompt_assembly"):
+        packed,stats=pack_context(query,docs,max_tokens=max_context_tokens)
+        trace.attributes.update(context_tokens=stats["packed_tokens"],context_tokens_unpacked=stats["input_tokens"])
+        context="\n\n".join(doc.page_content for doc in packed)
+        return prompt.format_messages(context=context,input=query)
+
+
+def stream_answer(llm,messages,trace):
+    """Yield answer tokens as they arrive, recording time to first token and generation time"""
+    start=time.perf_counter()
+    first=True
+    for chunk in llm.stream(messages):
+        text=chunk.content if hasattr(chunk,"content") else str(chunk)
+        if first and text:
+            trace.record("time_to_first_token",time.perf_counter()-start)
+            first=False
+        yield text
+    trace.record("generation",time.perf_counter()-start)
@@ -1,36 +1,111 @@
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import hashlib
+import os
+import threading
+from collections import OrderedDict
 
+import model_registry
+from reranker_server import RemoteReranker
 
-# Load Model and Tokenizer
+
+# Model and tokenizer are loaded lazily on first use, not at import time.
+# CPU-first: fp32 or int8-quantized weights, length-bucketed batches and
+# request coalescing across concurrent sessions (see reranker_backend.py).
+# With RERANKER_ADDRESS set, every worker shares one reranker_server.py process.
 model_name="BAAI/bge-reranker-base"
 
-reranker_model=AutoModelForSequenceClassification.from_pretrained(
-    model_name,
-    device_map="auto",
-    torch_dtype=torch.float16,
-)
-reranker_tokenizer=AutoTokenizer.from_pretrained(model_name)
 
+def _load_reranker():
+    address=os.getenv("RERANKER_ADDRESS")
+    if address:
+        return RemoteReranker(address)
 
-def rerank_documents(query,docs,top_n=3):
-    pairs = [(query, doc.page_content if hasattr(doc, "page_content") else str(doc)) for doc in docs]
-
-    inputs=reranker_tokenizer(
-        pairs,
-        padding=True,
-        truncation=True,
-        return_tensors="pt",
-        max_length=512,
+    from reranker_backend import RerankerBackend
+    return RerankerBackend(
+        model_name,
+        device=os.getenv("RERANKER_DEVICE") or None,
+        quantize=os.getenv("RERANKER_QUANTIZE","1")=="1",
+        max_length=int(os.getenv("RERANKER_MAX_LENGTH","512")),
+        batch_size=int(os.getenv("RERANKER_BATCH_SIZE","16")),
     )
 
-    with torch.no_grad():
-        scores=reranker_model(**inputs).logits.squeeze(-1)
+
+model_registry.register("reranker",_load_reranker)
+
+
+def get_reranker():
+    return model_registry.get("reranker")
+
+
+def warm_up_reranker():
+    """Start loading the reranker in the background; returns immediately"""
+    model_registry.warm_up_in_background("reranker")
+
+
+# Memoized (query, chunk) scores with bounded LRU eviction
+SCORE_CACHE_SIZE=20000
+_score_cache=OrderedDict()
+_score_cache_lock=threading.Lock()
+_score_cache_stats={"hits":0,"misses":0}
+
+
+def _pair_key(query,text):
+    return hashlib.sha1(f"{query}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def score_cache_info():
+    with _score_cache_lock:
+        return {**_score_cache_stats,"size":len(_score_cache),"max_size":SCORE_CACHE_SIZE}
+
+
+def clear_score_cache():
+    with _score_cache_lock:
+        _score_cache.clear()
+        _score_cache_stats.update(hits=0,misses=0)
+
+
+def _model_scores(query,texts):
+    return get_reranker().score([(query,text) for text in texts])
+
+
+def score_pairs(query,texts):
+    """Reranker score per text; only pairs missing from the cache go to the model, in one batch"""
+    keys=[_pair_key(query,text) for text in texts]
+    scores=[None]*len(texts)
+    missing={}  # key -> index of the first text with that key
+
+    with _score_cache_lock:
+        for i,key in enumerate(keys):
+            if key in _score_cache:
+                _score_cache.move_to_end(key)
+                scores[i]=_score_cache[key]
+                _score_cache_stats["hits"]+=1
+            elif key not in missing:
+                missing[key]=i
+                _score_cache_stats["misses"]+=1
+
+    if missing:
+        new_scores=dict(zip(missing,_model_scores(query,[texts[i] for i in missing.values()])))
+        with _score_cache_lock:
+            for key,score in new_scores.items():
+                _score_cache[key]=score
+                _score_cache.move_to_end(key)
+            while len(_score_cache)>SCORE_CACHE_SIZE:
+                _score_cache.popitem(last=False)
+        for i,key in enumerate(keys):
+            if scores[i] is None:
+                scores[i]=new_scores[key]
+
+    return scores
+
+
+def rerank_documents(query,docs,top_n=3):
+    texts=[doc.page_content if hasattr(doc, "page_content") else str(doc) for doc in docs]
+    scores=score_pairs(query,texts)
 
 
 
     # Sort by score
-    scored_docs=list(zip(scores.tolist(),docs))
+    scored_docs=list(zip(scores,docs))
 
     for score,doc in scored_docs:
         if not hasattr(doc,"metadata"):
@@ -41,4 +116,4 @@ def rerank_documents(query,docs,top_n=3):
 
     # Return top n docs
 
-    return [doc for score, doc in scored_docs[:top_n]]
\ No newline at end of file
+    return [doc for score, doc in scored_docs[:top_n]]
@@ -0,0 +1,99 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+
+class RerankerBackend:
+    """Cross-encoder reranker tuned for CPU hosts.
+
+    * fp32 weights on CPU, optionally dynamic int8 quantization of the Linear
+      layers; fp16 is only used on CUDA.
+    * Pairs are tokenized once, sorted by length and batched in buckets, so
+      short chunks are not padded to the longest chunk in the request.
+    * ``score`` calls from concurrent threads (Streamlit sessions) are
+      coalesced by a background worker into shared forward passes.
+    """
+
+    def __init__(self, model_name="BAAI/bge-reranker-base", device=None, quantize=True,
+                 max_length=512, batch_size=16, max_wait_ms=5, num_threads=None):
+        self.device=device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.max_length=max_length
+        self.batch_size=batch_size
+        self.max_wait=max_wait_ms/1000.0
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        self.tokenizer=AutoTokenizer.from_pretrained(model_name)
+        if self.device=="cpu":
+            model=AutoModelForSequenceClassification.from_pretrained(model_name,torch_dtype=torch.float32)
+            if quantize:
+                model=torch.quantization.quantize_dynamic(model,{torch.nn.Linear},dtype=torch.qint8)
+        else:
+            model=AutoModelForSequenceClassification.from_pretrained(model_name,torch_dtype=torch.float16).to(self.device)
+        self.model=model.eval()
+
+        self._queue=queue.Queue()
+        self._worker=threading.Thread(target=self._run,daemon=True)
+        self._worker.start()
+
+    def score_now(self,pairs):
+        """Score (query, text) pairs in this thread using length-bucketed batches"""
+        if not pairs:
+            return []
+        encoded=self.tokenizer(
+            [q for q,_ in pairs],
+            [t for _,t in pairs],
+            truncation=True,
+            max_length=self.max_length,
+        )
+        features=[{k:v[i] for k,v in encoded.items()} for i in range(len(pairs))]
+        order=sorted(range(len(pairs)),key=lambda i:len(features[i]["input_ids"]))
+
+        scores=[0.0]*len(pairs)
+        for start in range(0,len(order),self.batch_size):
+            bucket=order[start:start+self.batch_size]
+            batch=self.tokenizer.pad([features[i] for i in bucket],return_tensors="pt")
+            batch={k:v.to(self.device) for k,v in batch.items()}
+            with torch.inference_mode():
+                logits=self.model(**batch).logits.float().reshape(-1).tolist()
+            for i,score in zip(bucket,logits):
+                scores[i]=score
+        return scores
+
+    def score(self,pairs):
+        """Score pairs, sharing forward passes with other threads calling at the same time"""
+        future=Future()
+        self._queue.put((pairs,future))
+        return future.result()
+
+    def warmup(self):
+        self.score_now([("warm up","the reranker model")])
+
+    def _run(self):
+        while True:
+            requests=[self._queue.get()]
+            pending=len(requests[0][0])
+            deadline=time.perf_counter()+self.max_wait
+            while pending<self.batch_size*4:
+                remaining=deadline-time.perf_counter()
+                if remaining<=0:
+                    break
+                try:
+                    requests.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                pending+=len(requests[-1][0])
+
+            try:
+                scores=self.score_now([pair for pairs,_ in requests for pair in pairs])
+                offset=0
+                for pairs,future in requests:
+                    future.set_result(scores[offset:offset+len(pairs)])
+                    offset+=len(pairs)
+            except Exception as exc:
+                for _,future in requests:
+                    future.set_exception(exc)
@@ -0,0 +1,185 @@
+"""Local reranker inference server shared by several app worker processes.
+
+One process loads the reranker once; Streamlit workers connect over a local
+socket instead of each keeping its own copy of the model:
+
+    python reranker_server.py                       # Unix socket reranker.sock
+    RERANKER_ADDRESS=reranker.sock streamlit run app.py
+
+multiprocessing.connection unpickles what it receives, so whoever holds the
+auth key can run code in the server. There is no built-in key: the server
+uses RERANKER_AUTHKEY, or generates a random key into a 0600 key file
+(RERANKER_AUTHKEY_FILE, default reranker.key) that clients on the same
+machine read. The socket file is created 0600 too, and TCP addresses must be
+loopback unless --allow-remote is given.
+"""
+import argparse
+import os
+import secrets
+import socket
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+HERE=os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ADDRESS=os.path.join(HERE,"reranker.sock")
+DEFAULT_AUTHKEY_FILE=os.path.join(HERE,"reranker.key")
+LOOPBACK_HOSTS=("127.0.0.1","::1","localhost")
+
+
+def parse_address(address):
+    """'host:port' -> TCP tuple (host defaults to 127.0.0.1), anything else is a Unix socket path"""
+    host,sep,port=address.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1",int(port))
+    return address
+
+
+def _authkey_file():
+    return os.getenv("RERANKER_AUTHKEY_FILE",DEFAULT_AUTHKEY_FILE)
+
+
+def load_authkey():
+    """Client side: RERANKER_AUTHKEY, else the key file written by the server"""
+    key=os.getenv("RERANKER_AUTHKEY")
+    if key:
+        return key.encode("utf-8")
+    path=_authkey_file()
+    try:
+        with open(path,"rb") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        raise RuntimeError(f"No reranker auth key: set RERANKER_AUTHKEY or start reranker_server.py, "
+                           f"which writes {path}") from None
+
+
+def create_authkey():
+    """Server side: RERANKER_AUTHKEY, else a random key kept in a key file only the owner can read.
+
+    An existing key file is reused so running clients keep working across
+    server restarts, but only if no other user can read it.
+    """
+    key=os.getenv("RERANKER_AUTHKEY")
+    if key:
+        return key.encode("utf-8")
+    path=_authkey_file()
+    try:
+        fd=os.open(path,os.O_WRONLY|os.O_CREAT|os.O_EXCL,0o600)
+    except FileExistsError:
+        if os.name!="nt" and os.stat(path).st_mode & 0o077:
+            raise RuntimeError(f"{path} is accessible by other users; delete it or chmod 600 it")
+        return load_authkey()
+    key=secrets.token_hex(32).encode("ascii")
+    with os.fdopen(fd,"wb") as f:
+        f.write(key)
+    return key
+
+
+class RemoteReranker:
+    """Client with the same score()/warmup() interface as RerankerBackend"""
+
+    def __init__(self,address,authkey=None):
+        self.address=parse_address(address)
+        self.authkey=authkey or load_authkey()
+        self._local=threading.local()  # one connection per thread
+
+    def _connection(self):
+        conn=getattr(self._local,"conn",None)
+        if conn is None:
+            conn=Client(self.address,authkey=self.authkey)
+            self._local.conn=conn
+        return conn
+
+    def score(self,pairs):
+        for attempt in range(2):
+            try:
+                conn=self._connection()
+                conn.send(list(pairs))
+                reply=conn.recv()
+                break
+            except (EOFError,OSError):
+                self._local.conn=None  # server restarted: reconnect once
+                if attempt:
+                    raise
+        if isinstance(reply,Exception):
+            raise reply
+        return reply
+
+    def warmup(self):
+        self.score([("warm up","the reranker model")])
+
+
+def _serve_connection(conn,backend):
+    with conn:
+        while True:
+            try:
+                pairs=conn.recv()
+            except EOFError:
+                return
+            try:
+                conn.send(backend.score(pairs))  # coalesced with other connections' requests
+            except Exception as exc:
+                conn.send(RuntimeError(str(exc)))
+
+
+def _remove_stale_socket(path):
+    """Delete a socket file left behind by a server that is no longer running"""
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX) as probe:
+        try:
+            probe.connect(path)
+        except (ConnectionRefusedError,FileNotFoundError):
+            os.unlink(path)
+            return
+    raise RuntimeError(f"A reranker server is already listening on {path}")
+
+
+def serve(address,backend,allow_remote=False):
+    address=parse_address(address)
+    if isinstance(address,tuple):
+        if address[0] not in LOOPBACK_HOSTS and not allow_remote:
+            raise SystemExit(f"Refusing to listen on {address[0]}: anyone who can reach the port and "
+                             f"holds the key can run code in this process. Use a loopback address, "
+                             f"a Unix socket, or --allow-remote behind a firewall.")
+    else:
+        _remove_stale_socket(address)
+    authkey=create_authkey()
+    old_umask=os.umask(0o077)  # the socket file is created owner-only
+    try:
+        listener=Listener(address,authkey=authkey)
+    finally:
+        os.umask(old_umask)
+    with listener:
+        print(f"Reranker server listening on {address}")
+        while True:
+            try:
+                conn=listener.accept()
+            except (AuthenticationError,OSError) as exc:  # a bad client must not stop the server
+                print(f"Rejected reranker connection: {exc}")
+                continue
+            threading.Thread(target=_serve_connection,args=(conn,backend),daemon=True).start()
+
+
+def main():
+    from reranker_backend import RerankerBackend
+
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--address",default=os.getenv("RERANKER_ADDRESS",DEFAULT_ADDRESS),
+                        help="Unix socket path, or host:port (loopback only unless --allow-remote)")
+    parser.add_argument("--allow-remote",action="store_true",
+                        help="allow a non-loopback TCP address; only behind a firewall, with RERANKER_AUTHKEY set")
+    parser.add_argument("--model",default="BAAI/bge-reranker-base")
+    parser.add_argument("--max-length",type=int,default=int(os.getenv("RERANKER_MAX_LENGTH","512")))
+    parser.add_argument("--batch-size",type=int,default=int(os.getenv("RERANKER_BATCH_SIZE","16")))
+    parser.add_argument("--no-quantize",action="store_true")
+    args=parser.parse_args()
+
+    backend=RerankerBackend(args.model,quantize=not args.no_quantize,
+                            max_length=args.max_length,batch_size=args.batch_size)
+    backend.warmup()
+    serve(args.address,backend,allow_remote=args.allow_remote)
+
+
+if __name__=="__main__":
+    main()
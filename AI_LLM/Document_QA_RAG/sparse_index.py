@@ -0,0 +1,141 @@
+import json
+import os
+import re
+from collections import Counter
+from typing import Any, List
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """BM25 over a compact inverted index stored as flat postings arrays.
+
+    Term ``t`` owns ``doc_ids[offsets[t]:offsets[t + 1]]`` and the matching
+    ``term_freqs`` slice, so a query only touches the postings of its own
+    terms and search cost grows with query length, not corpus size.
+    """
+
+    ARRAYS = ("offsets", "doc_ids", "term_freqs", "doc_lengths")
+
+    def __init__(self, vocab, offsets, doc_ids, term_freqs, doc_lengths, k1=1.5, b=0.75):
+        self.vocab = vocab
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.num_docs = len(doc_lengths)
+        self.avg_doc_length = float(doc_lengths.mean()) if self.num_docs else 0.0
+        doc_freq = np.diff(offsets).astype(np.float32)
+        self.idf = np.log1p((self.num_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+    @classmethod
+    def build(cls, texts, k1=1.5, b=0.75):
+        vocab = {}
+        term_ids, doc_ids, freqs, lengths = [], [], [], []
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                doc_ids.append(doc_id)
+                freqs.append(tf)
+
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids, kind="stable")  # keeps doc ids sorted inside each posting list
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(vocab)), out=offsets[1:])
+        return cls(vocab,
+                   offsets,
+                   np.asarray(doc_ids, dtype=np.int32)[order],
+                   np.asarray(freqs, dtype=np.float32)[order],
+                   np.asarray(lengths, dtype=np.float32),
+                   k1, b)
+
+    def search(self, query, k=4):
+        """Return up to k (doc_id, score) pairs, best first"""
+        term_ids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not term_ids:
+            return []
+
+        ids, scores = [], []
+        for t in term_ids:
+            start, end = self.offsets[t], self.offsets[t + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.term_freqs[start:end]
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[docs] / self.avg_doc_length)
+            ids.append(docs)
+            scores.append(self.idf[t] * tf * (self.k1 + 1) / (tf + norm))
+
+        ids = np.concatenate(ids)
+        scores = np.concatenate(scores)
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
+        totals = np.bincount(inverse, weights=scores)
+        top = np.argsort(-totals)[:k] if len(totals) <= k else np.argpartition(-totals, k)[:k]
+        top = top[np.argsort(-totals[top])]
+        return [(int(unique_ids[i]), float(totals[i])) for i in top]
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump({"k1": self.k1, "b": self.b, "vocab": self.vocab}, f)
+
+    @classmethod
+    def load(cls, path):
+        """Load the index; postings arrays are memory-mapped rather than read into RAM"""
+        with open(os.path.join(path, "vocab.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in cls.ARRAYS}
+        return cls(meta["vocab"], k1=meta["k1"], b=meta["b"], **arrays)
+
+
+def save_documents(documents, path):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "documents.jsonl"), "w", encoding="utf-8") as f:
+        for doc in documents:
+            f.write(json.dumps({"page_content": doc.page_content, "metadata": doc.metadata}) + "\n")
+
+
+def load_documents(path):
+    with open(os.path.join(path, "documents.jsonl"), "r", encoding="utf-8") as f:
+        return [Document(**json.loads(line)) for line in f]
+
+
+class PersistentBM25Retriever(BaseRetriever):
+    """Drop-in replacement for BM25Retriever backed by a prebuilt BM25Index"""
+
+    index: Any
+    documents: List[Document]
+    k: int = 4
+
+    @classmethod
+    def from_documents(cls, documents, path=None, **kwargs):
+        """Build the index once; when path is given, persist it for later sessions"""
+        index = BM25Index.build([doc.page_content for doc in documents])
+        if path:
+            index.save(path)
+            save_documents(documents, path)
+        return cls(index=index, documents=list(documents), **kwargs)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        return cls(index=BM25Index.load(path), documents=load_documents(path), **kwargs)
+
+    def search(self, query, k=None):
+        """Top documents for the query without going through the retriever callbacks"""
+        return [self.documents[doc_id] for doc_id, _ in self.index.search(query, k or self.k)]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.search(query)
@@ -0,0 +1,92 @@
+import csv
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Stages in display order; anything else recorded is appended after these
+STAGES=["vector_search","bm25_search","retrieval","fusion","rerank","prompt_assembly",
+        "time_to_first_token","generation","total"]
+
+
+class QueryTrace:
+    """Wall-clock timings (perf_counter) for one query through the RAG pipeline"""
+
+    def __init__(self,query):
+        self.query=query
+        self.timestamp=time.time()
+        self.start=time.perf_counter()
+        self.spans={}
+        self.attributes={}
+        self._lock=threading.Lock()
+
+    def record(self,name,seconds):
+        with self._lock:
+            self.spans[name]=self.spans.get(name,0.0)+seconds
+
+    @contextmanager
+    def span(self,name):
+        start=time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name,time.perf_counter()-start)
+
+    def finish(self):
+        self.spans["total"]=time.perf_counter()-self.start
+        return self
+
+    def stage_ms(self):
+        names=[s for s in STAGES if s in self.spans]+[s for s in self.spans if s not in STAGES]
+        return {name:self.spans[name]*1000 for name in names}
+
+    def as_dict(self):
+        return {"query":self.query,"timestamp":self.timestamp,**self.attributes,
+                **{f"{name}_ms":round(ms,2) for name,ms in self.stage_ms().items()}}
+
+
+class TraceStore:
+    """Keeps recent traces in memory, appends every trace to a JSONL file and aggregates them"""
+
+    def __init__(self,path="traces.jsonl",max_traces=5000):
+        self.path=path
+        self.traces=deque(maxlen=max_traces)
+        self._lock=threading.Lock()
+
+    def add(self,trace):
+        row=trace.as_dict()
+        with self._lock:
+            self.traces.append(row)
+            if self.path:
+                with open(self.path,"a",encoding="utf-8") as f:
+                    f.write(json.dumps(row)+"\n")
+
+    def summary(self):
+        """count / mean / p50 / p95 / max in ms for every stage"""
+        with self._lock:
+            rows=list(self.traces)
+        stages={}
+        for row in rows:
+            for key,value in row.items():
+                if key.endswith("_ms"):
+                    stages.setdefault(key[:-3],[]).append(value)
+        ordered=[s for s in STAGES if s in stages]+[s for s in stages if s not in STAGES]
+        return {name:{"count":len(stages[name]),
+                      "mean_ms":round(float(np.mean(stages[name])),2),
+                      "p50_ms":round(float(np.percentile(stages[name],50)),2),
+                      "p95_ms":round(float(np.percentile(stages[name],95)),2),
+                      "max_ms":round(float(np.max(stages[name])),2)}
+                for name in ordered}
+
+    def export_csv(self,path):
+        with self._lock:
+            rows=list(self.traces)
+        fields=sorted({key for row in rows for key in row},key=lambda k:(k!="query",k!="timestamp",k))
+        with open(path,"w",newline="",encoding="utf-8") as f:
+            writer=csv.DictWriter(f,fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
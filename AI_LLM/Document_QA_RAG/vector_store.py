@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+
+import faiss
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_community.vectorstores import FAISS
+from pypdf import PdfReader
+
+from sparse_index import PersistentBM25Retriever
+
+INDEX_DIR = "vector_index"
+MANIFEST_FILE = "manifest.json"
+BM25_SUBDIR = "bm25"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(index_dir=INDEX_DIR):
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"version": None, "files": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _manifest_version(files):
+    digest = hashlib.sha1()
+    for name in sorted(files):
+        digest.update(f"{name}:{files[name]['sha256']}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _refresh_lock(lock_path, interval, stop):
+    """Touch the lock file until stop is set, so a long ingestion is never taken for a crashed one"""
+    while not stop.wait(interval):
+        try:
+            os.utime(lock_path)
+        except FileNotFoundError:
+            return
+
+
+@contextmanager
+def index_lock(index_dir=INDEX_DIR, timeout=600, stale_after=1800):
+    """Cross-process lock so only one worker updates the index at a time.
+
+    The holder touches the lock file every stale_after / 3 seconds; a lock not
+    touched for stale_after seconds was left behind by a crashed process and
+    is removed.
+    """
+    lock_path = index_dir.rstrip("/\\") + ".lock"
+    start = time.time()
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                age = time.time() - os.path.getmtime(lock_path)
+            except FileNotFoundError:
+                continue  # released between the open and the stat
+            if age > stale_after:
+                os.remove(lock_path)  # left behind by a crashed process
+                continue
+            if time.time() - start > timeout:
+                raise TimeoutError(f"Timed out waiting for index lock {lock_path}")
+            time.sleep(0.5)
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_refresh_lock, args=(lock_path, stale_after / 3, stop), daemon=True)
+    heartbeat.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        heartbeat.join()
+        os.close(fd)
+        os.remove(lock_path)
+
+
+def load_vector_index(embeddings, index_dir=INDEX_DIR, mmap=True):
+    """Load the persisted FAISS store; with mmap=True the vectors stay on disk and are paged in"""
+    if not os.path.exists(os.path.join(index_dir, "index.faiss")):
+        return None
+    flags = faiss.IO_FLAG_MMAP if mmap else 0
+    try:
+        index = faiss.read_index(os.path.join(index_dir, "index.faiss"), flags)
+    except RuntimeError:
+        index = faiss.read_index(os.path.join(index_dir, "index.faiss"))
+    with open(os.path.join(index_dir, "index.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+def load_keyword_retriever(index_dir=INDEX_DIR, k=4):
+    path = os.path.join(index_dir, BM25_SUBDIR)
+    if not os.path.exists(path):
+        return None
+    return PersistentBM25Retriever.load(path, k=k)
+
+
+def indexed_documents(vectorstore):
+    """All chunks in FAISS order"""
+    return [vectorstore.docstore.search(doc_id) for _, doc_id in sorted(vectorstore.index_to_docstore_id.items())]
+
+
+def iter_chunk_batches(pdf_path, text_splitter, batch_size):
+    """Load a PDF page by page and yield its chunks in batches of at most batch_size"""
+    batch = []
+    for page in PyPDFLoader(pdf_path).lazy_load():
+        batch.extend(text_splitter.split_documents([page]))
+        while len(batch) >= batch_size:
+            yield batch[:batch_size], page.metadata.get("page")
+            batch = batch[batch_size:]
+    if batch:
+        yield batch, None
+
+
+def sync_index(pdf_dir, embeddings, text_splitter, index_dir=INDEX_DIR, batch_size=64,
+               max_concurrency=4, progress=None):
+    """Bring the persisted index in line with the PDFs in pdf_dir.
+
+    Only new or changed PDFs are ingested; chunks of changed or removed PDFs
+    are deleted. Ingestion streams: pages are loaded one at a time, chunks are
+    embedded in batches of batch_size with at most max_concurrency embedding
+    calls in flight, and each batch is appended to the index as it finishes.
+    That bounds the memory used by ingestion (pages and pending batches), not
+    the index itself: the FAISS flat index and docstore of the whole corpus
+    stay in memory, and the BM25 index is rebuilt over every indexed document
+    whenever something changed. progress(done, total, message) is called after
+    every batch with page counts.
+    Returns (manifest, changed) where changed says whether anything was re-embedded.
+    """
+    with index_lock(index_dir):
+        manifest = load_manifest(index_dir)
+        current = {name: file_sha256(os.path.join(pdf_dir, name))
+                   for name in sorted(os.listdir(pdf_dir)) if name.lower().endswith(".pdf")}
+        indexed = manifest["files"]
+
+        stale = [name for name in indexed if current.get(name) != indexed[name]["sha256"]]
+        added = [name for name in current if indexed.get(name, {}).get("sha256") != current[name]]
+        if not stale and not added and manifest["version"] is not None:
+            return manifest, False
+
+        vectorstore = load_vector_index(embeddings, index_dir, mmap=False)
+        stale_ids = [chunk_id for name in stale for chunk_id in indexed.pop(name)["chunk_ids"]]
+        if vectorstore is not None and stale_ids:
+            vectorstore.delete(stale_ids)
+
+        page_counts = {name: len(PdfReader(os.path.join(pdf_dir, name)).pages) for name in added}
+        total_pages = sum(page_counts.values())
+        pages_done = 0
+
+        def append(batch, vectors):
+            nonlocal vectorstore
+            texts = [doc.page_content for doc in batch]
+            metadatas = [doc.metadata for doc in batch]
+            ids = [str(uuid.uuid4()) for _ in batch]
+            if vectorstore is None:
+                vectorstore = FAISS.from_embeddings(list(zip(texts, vectors)), embeddings,
+                                                    metadatas=metadatas, ids=ids)
+            else:
+                vectorstore.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas, ids=ids)
+            return ids
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            for name in added:
+                chunk_ids = []
+                in_flight = []  # (future, batch) in submission order, at most max_concurrency
+                for batch, last_page in iter_chunk_batches(os.path.join(pdf_dir, name), text_splitter, batch_size):
+                    in_flight.append((pool.submit(embeddings.embed_documents,
+                                                  [doc.page_content for doc in batch]), batch))
+                    if len(in_flight) >= max_concurrency:
+                        wait([in_flight[0][0]], return_when=FIRST_COMPLETED)
+                    # Append finished batches in order so chunk ids follow page order
+                    while in_flight and in_flight[0][0].done():
+                        future, done_batch = in_flight.pop(0)
+                        chunk_ids.extend(append(done_batch, future.result()))
+                    if progress is not None and last_page is not None:
+                        progress(pages_done + last_page + 1, total_pages, f"Embedding {name}")
+                for future, done_batch in in_flight:
+                    chunk_ids.extend(append(done_batch, future.result()))
+                pages_done += page_counts[name]
+                indexed[name] = {"sha256": current[name], "pages": page_counts[name], "chunk_ids": chunk_ids}
+                if progress is not None:
+                    progress(pages_done, total_pages, f"Indexed {name}")
+
+        manifest = {"version": _manifest_version(indexed), "files": indexed}
+        _write_index(vectorstore, manifest, index_dir)
+        return manifest, True
+
+
+def _write_index(vectorstore, manifest, index_dir):
+    """Write into a temporary directory and swap it in, so readers never see a half-written index"""
+    tmp_dir = index_dir.rstrip("/\\") + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    if vectorstore is not None:
+        vectorstore.save_local(tmp_dir)
+        PersistentBM25Retriever.from_documents(indexed_documents(vectorstore),
+                                               path=os.path.join(tmp_dir, BM25_SUBDIR))
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    old_dir = index_dir.rstrip("/\\") + ".old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(index_dir):
+        os.replace(index_dir, old_dir)
+    os.replace(tmp_dir, index_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
@@ -0,0 +1 @@
+"""Modules shared by the RAG projects in AI_LLM/ (Document_QA_RAG, Compliance_Sustainability_RAG)."""
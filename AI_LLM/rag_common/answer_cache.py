@@ -0,0 +1,124 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_question(question):
+    """Lower-case, collapse whitespace and drop trailing punctuation for exact matching."""
+    text = re.sub(r'\s+', ' ', question.strip().lower())
+    return text.rstrip(' ?!.')
+
+
+class AnswerCache:
+    """Two-layer answer cache: exact question match, then semantic near-duplicate match.
+
+    Entries are keyed on the index version, so rebuilding the index makes old
+    answers unreachable. Entries expire after ``ttl_seconds`` and the least
+    recently used entry is evicted once ``max_entries`` is reached.
+    """
+
+    def __init__(self, embed_fn=None, index_version=None, similarity_threshold=0.95,
+                 ttl_seconds=3600, max_entries=1024):
+        self.embed_fn = embed_fn
+        self.index_version = index_version
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (version, normalized question) -> entry dict
+        self._recent_embeddings = OrderedDict()  # question -> vector, so a miss + put embeds once
+        self._lock = threading.Lock()
+        self._metrics = {"exact_hits": 0, "semantic_hits": 0, "misses": 0,
+                         "evictions": 0, "expirations": 0}
+
+    def _embed(self, question):
+        if self.embed_fn is None:
+            return None
+        with self._lock:
+            vector = self._recent_embeddings.get(question)
+        if vector is not None:
+            return vector
+        # The embedding call runs outside the lock so concurrent lookups are not serialized on it
+        vector = np.asarray(self.embed_fn(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        vector = vector / norm if norm else vector
+        with self._lock:
+            self._recent_embeddings[question] = vector
+            while len(self._recent_embeddings) > 64:
+                self._recent_embeddings.popitem(last=False)
+        return vector
+
+    def _expired(self, entry, now):
+        return self.ttl_seconds is not None and now - entry["created"] > self.ttl_seconds
+
+    def _purge_expired(self, now):
+        for key in [k for k, e in self._entries.items() if self._expired(e, now)]:
+            del self._entries[key]
+            self._metrics["expirations"] += 1
+
+    def set_index_version(self, index_version):
+        """Switch to a new index version and drop entries from older ones."""
+        with self._lock:
+            if index_version == self.index_version:
+                return
+            self.index_version = index_version
+            for key in [k for k in self._entries if k[0] != index_version]:
+                del self._entries[key]
+
+    def get(self, question):
+        """Return the cached value for the question, or None on a miss."""
+        key = (self.index_version, normalize_question(question))
+        now = time.time()
+        with self._lock:
+            self._purge_expired(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._metrics["exact_hits"] += 1
+                return entry["value"]
+            candidates = [(k, e) for k, e in self._entries.items()
+                          if k[0] == self.index_version and e["embedding"] is not None]
+
+        if self.embed_fn is not None and candidates:
+            query_vec = self._embed(question)
+            matrix = np.stack([e["embedding"] for _, e in candidates])
+            similarities = matrix @ query_vec
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.similarity_threshold:
+                best_key = candidates[best][0]
+                with self._lock:
+                    entry = self._entries.get(best_key)
+                    if entry is not None:
+                        self._entries.move_to_end(best_key)
+                        self._metrics["semantic_hits"] += 1
+                        return entry["value"]
+
+        with self._lock:
+            self._metrics["misses"] += 1
+        return None
+
+    def put(self, question, value):
+        """Store the value for the question under the current index version."""
+        key = (self.index_version, normalize_question(question))
+        embedding = self._embed(question)
+        with self._lock:
+            self._entries[key] = {"value": value, "embedding": embedding, "created": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._metrics["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters plus the current size and hit rate."""
+        with self._lock:
+            stats = dict(self._metrics)
+            stats["size"] = len(self._entries)
+        lookups = stats["exact_hits"] + stats["semantic_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["exact_hits"] + stats["semantic_hits"]) / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,148 @@
+import re
+from functools import lru_cache
+
+from langchain_core.documents import Document
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+WORD = re.compile(r"\w+")
+
+
+def approx_token_count(text):
+    """Rough token count (~4 characters per token) when no tokenizer is available."""
+    return (len(text) + 3) // 4
+
+
+@lru_cache(maxsize=1)
+def default_token_counter():
+    """tiktoken's cl100k_base when installed (close to Llama 3's BPE), else the approximation."""
+    try:
+        import tiktoken
+    except ImportError:
+        return approx_token_count
+    encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def tokenizer_token_counter(tokenizer):
+    """Count tokens with a Hugging Face tokenizer, e.g. the generator's own."""
+    return lambda text: len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+
+def _overlap(left, right, min_chars, max_chars):
+    """Length of the longest suffix of left that is also a prefix of right."""
+    for size in range(min(len(left), len(right), max_chars), min_chars - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def remove_overlap(text, packed_texts, min_chars=20, max_chars=400):
+    """Strip text shared with already packed chunks of the same source.
+
+    RecursiveCharacterTextSplitter repeats up to chunk_overlap characters
+    between neighbouring chunks: the head of a chunk can be the tail of the
+    previous one and the tail the head of the next one. Returns the remaining
+    text, or "" when the chunk is fully contained in a packed chunk.
+    """
+    for packed in packed_texts:
+        if text in packed:
+            return ""
+        text = text[_overlap(packed, text, min_chars, max_chars):].lstrip()
+        size = _overlap(text, packed, min_chars, max_chars)
+        if size:
+            text = text[:-size].rstrip()
+    return text
+
+
+def _truncate(text, budget, count_tokens):
+    """Longest word prefix of text within budget tokens (binary search)."""
+    words = text.split(" ")
+    low, high = 0, len(words)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:mid])) <= budget:
+            low = mid
+        else:
+            high = mid - 1
+    return " ".join(words[:low])
+
+
+def compress(text, query, budget, count_tokens):
+    """Fit text into budget tokens, keeping the sentences that share most words with the query.
+
+    Kept sentences stay in their original order; a single sentence that is
+    still too long is cut at a word boundary. Sentences are selected by their
+    own token counts, then the joined text is re-counted and cut if joining
+    added tokens, so the result never exceeds budget.
+    """
+    sentences = [s for s in SENTENCE_END.split(text) if s.strip()]
+    query_terms = set(WORD.findall(query.lower()))
+    ranked = sorted(range(len(sentences)),
+                    key=lambda i: (-len(query_terms & set(WORD.findall(sentences[i].lower()))), i))
+    kept, used = set(), 0
+    for i in ranked:
+        tokens = count_tokens(sentences[i])
+        if used + tokens <= budget:
+            kept.add(i)
+            used += tokens
+    if not kept:
+        return _truncate(sentences[ranked[0]] if sentences else text, budget, count_tokens)
+    joined = " ".join(sentences[i] for i in sorted(kept))
+    return joined if count_tokens(joined) <= budget else _truncate(joined, budget, count_tokens)
+
+
+def pack_context(query, docs, max_tokens=1024, count_tokens=None, score_key="rerank_score",
+                 min_chunk_tokens=32, min_overlap_chars=20, max_overlap_chars=400):
+    """Select, de-duplicate and trim chunks so the context fits max_tokens.
+
+    Chunks are taken best first by metadata[score_key] (the given order when a
+    chunk has no score). Overlap with chunks already packed from the same
+    metadata["source"] is removed (chunks without a source are never
+    compared), the chunk that crosses the budget is compressed to the
+    remaining tokens (dropped if fewer than min_chunk_tokens remain), and
+    everything after it is left out.
+    Returns (documents, stats); each document carries its token count in
+    metadata["context_tokens"].
+    """
+    count_tokens = count_tokens or default_token_counter()
+    if all(score_key in doc.metadata for doc in docs):
+        docs = sorted(docs, key=lambda doc: doc.metadata[score_key], reverse=True)
+
+    packed, by_source = [], {}
+    stats = {"chunks": len(docs), "packed_chunks": 0, "trimmed_chunks": 0, "dropped_chunks": 0,
+             "overlap_chars_removed": 0, "input_tokens": 0, "packed_tokens": 0}
+    used = 0
+    for doc in docs:
+        text = doc.page_content.strip()
+        stats["input_tokens"] += count_tokens(text)
+        if used >= max_tokens:
+            stats["dropped_chunks"] += 1
+            continue
+
+        source = doc.metadata.get("source")
+        source_texts = by_source.setdefault(source, []) if source is not None else []
+        deduped = remove_overlap(text, source_texts, min_overlap_chars, max_overlap_chars)
+        stats["overlap_chars_removed"] += len(text) - len(deduped)
+        tokens = count_tokens(deduped) if deduped else 0
+        trimmed = False
+        if tokens and used + tokens > max_tokens:
+            remaining = max_tokens - used
+            if remaining >= min_chunk_tokens:
+                deduped = compress(deduped, query, remaining, count_tokens)
+                tokens = count_tokens(deduped) if deduped else 0
+                trimmed = True
+            else:
+                deduped = ""
+        if not deduped:
+            stats["dropped_chunks"] += 1
+            continue
+
+        source_texts.append(text)
+        used += tokens
+        stats["trimmed_chunks"] += trimmed
+        packed.append(Document(page_content=deduped,
+                               metadata={**doc.metadata, "context_tokens": tokens, "trimmed": trimmed}))
+
+    stats["packed_chunks"] = len(packed)
+    stats["packed_tokens"] = used
+    return packed, stats
@@ -0,0 +1,37 @@
+import pytest
+from langchain_core.documents import Document
+
+from rag_common.context_packer import approx_token_count, compress, pack_context
+
+QUERY = "How does the reranker change retrieval quality?"
+SENTENCES = [
+    "The reranker scores every candidate chunk against the query.",
+    "Retrieval quality improves when the cross-encoder reorders candidates.",
+    "Latency grows with the number of chunks that are reranked.",
+    "BM25 and vector search are fused before reranking.",
+    "Short chunks lose context, long chunks dilute the signal.",
+] * 4
+
+
+def _docs():
+    text = " ".join(SENTENCES)
+    return [Document(page_content=text[i:i + 600], metadata={"source": f"paper_{i % 3}.pdf",
+                                                               "rerank_score": -i})
+            for i in range(0, len(text), 300)]
+
+
+# len() counts every joining space as a token, so it exposes any gap between
+# per-sentence counts and the count of the joined text
+@pytest.mark.parametrize("count_tokens", [len, approx_token_count])
+@pytest.mark.parametrize("max_tokens", [40, 100, 300, 301, 512, 1024])
+def test_packed_context_fits_budget(count_tokens, max_tokens):
+    docs, stats = pack_context(QUERY, _docs(), max_tokens=max_tokens, count_tokens=count_tokens,
+                               min_chunk_tokens=8)
+    assert sum(count_tokens(doc.page_content) for doc in docs) <= max_tokens
+    assert stats["packed_tokens"] <= max_tokens
+
+
+@pytest.mark.parametrize("budget", [10, 57, 120, 300])
+def test_compress_fits_budget(budget):
+    text = " ".join(SENTENCES)
+    assert len(compress(text, QUERY, budget, len)) <= budget
@@ -0,0 +1,96 @@
+"""Training time, memory and ROC AUC: random forest vs histogram gradient boosting.
+
+credit_data.csv is cleaned as in casestudy.py and split 80/20. Then the
+train and test parts are each grown by --scales (10x and 100x by default)
+by resampling their own rows. Numeric columns get a small Gaussian jitter.
+Test rows are never copies of training rows. Each engine is fitted in a
+fresh worker process, and memory is that process's peak RSS growth during
+the fit. The forest's time includes category encoding and scaling, because
+gradient boosting reads the category columns directly:
+
+    python benchmark_engines.py --scales 1 10 100
+"""
+import argparse
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from data_prep import NUMERIC_DTYPES, TARGET, CategoryEncoder, read_credit_data
+from engines import ENGINES, NATIVE_CATEGORICAL_ENGINES, make_engine
+
+
+def load_clean(data_path='credit_data.csv'):
+    """The case study's cleaning: drop rows with a missing or invalid target, median-fill numeric columns."""
+    data = read_credit_data(data_path)
+    data = data[data[TARGET].notna() & (data[TARGET] != -1)]
+    data = data.astype({TARGET: NUMERIC_DTYPES[TARGET]})
+    return data.fillna(data.median(numeric_only=True))
+
+
+def grow(data, scale, seed=42, noise=0.05):
+    """Resample scale * len(data) rows and jitter numeric features by noise * their std."""
+    rng = np.random.default_rng(seed)
+    grown = data.iloc[rng.integers(0, len(data), scale * len(data))].reset_index(drop=True)
+    for column, dtype in NUMERIC_DTYPES.items():
+        if column == TARGET:
+            continue
+        values = grown[column].to_numpy(dtype=np.float64)
+        values = values + rng.normal(0.0, noise * data[column].std(), len(values))
+        grown[column] = np.clip(np.round(values), data[column].min(), data[column].max()).astype(dtype)
+    return grown
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_engine(engine, train, test, n_jobs=-1, seed=42):
+    """Fit and score one engine; runs in its own process so peak RSS belongs to this fit alone."""
+    X_train, y_train = train.drop(columns=TARGET), train[TARGET]
+    X_test, y_test = test.drop(columns=TARGET), test[TARGET]
+    baseline_mb = peak_rss_mb()
+    start = time.perf_counter()
+    if engine not in NATIVE_CATEGORICAL_ENGINES:
+        category_encoder = CategoryEncoder().fit(X_train)
+        scaler = StandardScaler(copy=False)
+        X_train = scaler.fit_transform(category_encoder.transform(X_train).to_numpy(dtype=np.float32))
+        X_test = scaler.transform(category_encoder.transform(X_test).to_numpy(dtype=np.float32))
+    model = make_engine(engine, n_jobs=n_jobs, random_state=seed).fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    memory_mb = peak_rss_mb() - baseline_mb
+    auc = roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])
+    return {"fit_seconds": fit_seconds, "memory_mb": memory_mb, "auc": auc,
+            "iterations": getattr(model, "n_iter_", None)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100],
+                        help="multiples of the credit_data.csv row count")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    data = load_clean()
+    train, test = train_test_split(data, test_size=0.2, random_state=args.seed, stratify=data[TARGET])
+
+    print(f"{'rows':>8} {'engine':<24} {'fit s':>8} {'peak MB':>8} {'ROC AUC':>8} {'iters':>6}")
+    for scale in args.scales:
+        grown_train, grown_test = grow(train, scale, args.seed), grow(test, scale, args.seed + 1)
+        for engine in args.engines:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(run_engine, engine, grown_train, grown_test, args.n_jobs, args.seed).result()
+            iterations = result["iterations"] if result["iterations"] is not None else "-"
+            print(f"{len(grown_train) + len(grown_test):>8} {engine:<24} {result['fit_seconds']:>8.2f} "
+                  f"{result['memory_mb']:>8.1f} {result['auc']:>8.4f} {iterations:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Explanations/sec for random forest attributions on test batches.
+
+A forest is trained on credit_data.csv grown --scale times (see
+benchmark_engines.grow). Then it compares:
+- ForestExplainer on whole batches: one decision_path call plus one sparse product.
+- The same explainer called one row at a time, as a naive scoring loop would.
+- Sampled permutation importance at several --max-samples.
+
+It also checks that bias + contributions reproduces predict_proba:
+
+    python benchmark_explanations.py --scale 100 --batches 1000 10000 100000
+"""
+import argparse
+import time
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from benchmark_engines import grow, load_clean
+from data_prep import TARGET, CategoryEncoder
+from engines import make_engine
+from explain import ForestExplainer, sampled_permutation_importance
+
+
+def encode(category_encoder, scaler, data):
+    return scaler.transform(category_encoder.transform(data.drop(columns=TARGET)).to_numpy(dtype=np.float32))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100, help="multiple of the credit_data.csv row count")
+    parser.add_argument("--batches", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--single-rows", type=int, default=200, help="rows explained one at a time")
+    parser.add_argument("--max-samples", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    data = load_clean()
+    train, test = train_test_split(data, test_size=0.2, random_state=args.seed, stratify=data[TARGET])
+    train, test = grow(train, args.scale, args.seed), grow(test, args.scale, args.seed + 1)
+    # Explanation batches are drawn from grown test rows, so make enough of them
+    test = grow(test, -(-max(args.batches) // len(test)), args.seed + 2)
+
+    category_encoder = CategoryEncoder().fit(train)
+    scaler = StandardScaler().fit(category_encoder.transform(train.drop(columns=TARGET)).to_numpy(dtype=np.float32))
+    X_train, X_test = encode(category_encoder, scaler, train), encode(category_encoder, scaler, test)
+    forest = make_engine("random_forest", n_jobs=args.n_jobs, random_state=args.seed).fit(X_train, train[TARGET])
+    feature_names = list(train.columns.drop(TARGET))
+
+    start = time.perf_counter()
+    explainer = ForestExplainer(forest, feature_names)
+    print(f"Forest: {len(forest.estimators_)} trees, {explainer.node_shifts_.shape[0]} nodes, "
+          f"trained on {len(X_train)} rows; explainer built in {time.perf_counter() - start:.2f}s")
+
+    print(f"{'mode':<16} {'rows':>8} {'seconds':>8} {'expl/s':>10} {'max |error|':>12}")
+    for batch in args.batches:
+        X = X_test[:batch]
+        start = time.perf_counter()
+        contributions = explainer.contributions(X)
+        seconds = time.perf_counter() - start
+        error = np.abs(explainer.bias_ + contributions.sum(axis=1) - forest.predict_proba(X)[:, -1]).max()
+        print(f"{'batch':<16} {len(X):>8} {seconds:>8.2f} {len(X) / seconds:>10.0f} {error:>12.2e}")
+
+    start = time.perf_counter()
+    for row in X_test[:args.single_rows]:
+        explainer.contributions(row[None, :])
+    seconds = time.perf_counter() - start
+    print(f"{'row at a time':<16} {args.single_rows:>8} {seconds:>8.2f} {args.single_rows / seconds:>10.0f}")
+
+    print(f"\n{'permutation importance':<24} {'seconds':>8}  top features")
+    for max_samples in args.max_samples:
+        start = time.perf_counter()
+        importance = sampled_permutation_importance(forest, X_test, test[TARGET], feature_names,
+                                                    max_samples=max_samples, n_jobs=args.n_jobs,
+                                                    random_state=args.seed)
+        seconds = time.perf_counter() - start
+        print(f"{f'max_samples={max_samples}':<24} {seconds:>8.2f}  {', '.join(importance.index[:3])}")
+
+
+if __name__ == "__main__":
+    main()
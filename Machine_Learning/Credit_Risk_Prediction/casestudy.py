@@ -1,148 +1,342 @@
-import pandas as pd
+"""Credit risk prediction with a Random Forest.
+
+By default the EDA and evaluation figures are shown interactively, as before.
+With --headless the script runs as a batch job. Figures are saved to
+--plots-dir, or skipped if no folder is given. The forest trains on all cores
+and reports its out-of-bag score. The fitted model, category encoder and
+scaler are saved for reuse. Per-phase timings are printed and saved as JSON:
+
+    python casestudy.py
+    python casestudy.py --headless --plots-dir plots
+    python casestudy.py --headless --oob-only   # train on all rows, evaluate out-of-bag
+    python casestudy.py --headless --engine hist_gradient_boosting
+    python casestudy.py --headless --explain    # per-row attributions + permutation importance
+"""
+import argparse
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import joblib
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, roc_auc_score, roc_curve, auc, confusion_matrix, ConfusionMatrixDisplay
+from sklearn.metrics import classification_report, roc_auc_score, confusion_matrix, ConfusionMatrixDisplay
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-# Step 1: Load the dataset
-file_path = 'credit_data.csv'
-data = pd.read_csv(file_path)
-
-# Inspect the data
-print(data.info())
-print(data.describe())
-
-# Step 2: Data Cleaning
-# Check for missing values
-missing_values = data.isnull().sum()
-print("Missing values per column:\n", missing_values)
-
-# Visualize overall missing values with counts
-plt.figure(figsize=(10, 6))
-ax = missing_values[missing_values > 0].plot(kind='bar', color='skyblue')
-plt.title("Missing Values per Column")
-plt.xlabel("Columns")
-plt.ylabel("Count of Missing Values")
-plt.xticks(rotation=45, ha='right')
-for p in ax.patches:
-    ax.annotate(f'{int(p.get_height())}', (p.get_x() + p.get_width() / 2., p.get_height()),
-                ha='center', va='center', fontsize=10, color='black', xytext=(0, 5),
-                textcoords='offset points')
-plt.tight_layout()
-plt.show()
-
-# Visualize target distribution before cleaning
-plt.figure(figsize=(10, 6))
-ax = sns.countplot(x='credit_risk', data=data)
-plt.title('Credit Risk Distribution (Before Cleaning)')
-for p in ax.patches:
-    ax.annotate(f'{int(p.get_height())}', (p.get_x() + p.get_width() / 2., p.get_height()),
-                ha='center', va='center', fontsize=10, color='black', xytext=(0, 5),
-                textcoords='offset points')
-plt.show()
-
-# Handle missing or invalid target values (-1 treated as missing)
-data = data[data['credit_risk'] != -1]
-
-# Visualize target distribution after cleaning
-plt.figure(figsize=(10, 6))
-ax = sns.countplot(x='credit_risk', data=data)
-plt.title('Credit Risk Distribution (After Cleaning)')
-for p in ax.patches:
-    ax.annotate(f'{int(p.get_height())}', (p.get_x() + p.get_width() / 2., p.get_height()),
-                ha='center', va='center', fontsize=10, color='black', xytext=(0, 5),
-                textcoords='offset points')
-plt.show()
-
-# Fill missing numerical values with the median
-data.fillna(data.median(numeric_only=True), inplace=True)
-
-# Step 3: Exploratory Data Analysis (EDA)
-plt.figure(figsize=(10, 6))
-ax = sns.countplot(x='credit_risk', data=data)
-plt.title('Credit Risk Distribution')
-for p in ax.patches:
-    ax.annotate(f'{int(p.get_height())}', (p.get_x() + p.get_width() / 2., p.get_height()),
-                ha='center', va='center', fontsize=10, color='black', xytext=(0, 5),
-                textcoords='offset points')
-plt.show()
-
-# Convert categorical features to numeric for correlation analysis
-categorical_columns = data.select_dtypes(include=['object']).columns
-for col in categorical_columns:
-    data[col] = LabelEncoder().fit_transform(data[col])
-
-# Correlation heatmap for numeric features
-plt.figure(figsize=(12, 8))
-ax = sns.heatmap(data.corr(), annot=True, fmt=".2f", cmap="coolwarm")
-plt.title('Correlation Heatmap')
-plt.xticks(rotation=45, ha='right')
-plt.yticks(rotation=0)
-plt.tight_layout()
-plt.show()
-
-# Step 4: Data Preprocessing
-# Encoding categorical variables
-label_encoders = {}
-for column in categorical_columns:
-    le = LabelEncoder()
-    data[column] = le.fit_transform(data[column].astype(str))
-    label_encoders[column] = le
-
-# Separating features and target
-X = data.drop('credit_risk', axis=1)
-y = data['credit_risk']
-
-# Splitting the dataset
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-
-# Scaling numerical features
-scaler = StandardScaler()
-X_train = scaler.fit_transform(X_train)
-X_test = scaler.transform(X_test)
-
-# Step 5: Model Training
-clf = RandomForestClassifier(random_state=42)
-clf.fit(X_train, y_train)
-
-# Step 6: Evaluation
-predictions = clf.predict(X_test)
-print("Classification Report:\n", classification_report(y_test, predictions))
-
-# Confusion Matrix
-cm = confusion_matrix(y_test, predictions)
-labels = sorted(np.unique(y))  # Ensure correct class labels sorted
-plt.figure(figsize=(8, 6))
-cmd = ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=labels)
-cmd.plot(cmap='Blues', values_format='d')
-plt.title('Confusion Matrix')
-plt.show()
-
-# AUC-ROC for multi-class classification
-if len(np.unique(y)) > 2: 
-    y_pred_proba = clf.predict_proba(X_test)
-    y_test_encoded = LabelEncoder().fit_transform(y_test)
-    auc_score = roc_auc_score(y_test_encoded, y_pred_proba, multi_class='ovr')
-    print("AUC-ROC Score (Multi-class, OVR):", auc_score)
-else:
-    probs = clf.predict_proba(X_test)[:, 1]
-    auc = roc_auc_score(y_test, probs)
-    print("AUC-ROC Score:", auc)
-
-# Feature importance
-importances = clf.feature_importances_
-indices = np.argsort(importances)[::-1]
-feature_names = X.columns
-
-plt.figure(figsize=(12, 6))
-plt.title("Feature Importance")
-ax = plt.bar(range(X.shape[1]), importances[indices], align="center")
-plt.xticks(range(X.shape[1]), feature_names[indices], rotation=45, ha='right')
-for i, rect in enumerate(ax):
-    plt.text(rect.get_x() + rect.get_width() / 2., rect.get_height(), f'{importances[indices[i]]:.2f}',
-             ha='center', va='bottom', fontsize=8)
-plt.tight_layout()
-plt.show()
+from data_prep import NUMERIC_DTYPES, TARGET, CategoryEncoder, memory_report, read_credit_data
+from engines import ENGINES, NATIVE_CATEGORICAL_ENGINES, make_engine
+from explain import ForestExplainer, sampled_permutation_importance
+
+MODEL_PATH = 'credit_risk_model.joblib'
+TIMINGS_PATH = 'casestudy_timings.json'
+EXPLANATIONS_PATH = 'explanations.csv'
+
+
+class Figures:
+    """Where figures go: shown interactively, saved to a folder, or skipped."""
+
+    def __init__(self, headless=False, plots_dir=None):
+        self.headless = headless
+        self.plots_dir = plots_dir
+        if headless:
+            plt.switch_backend('Agg')
+        if plots_dir:
+            os.makedirs(plots_dir, exist_ok=True)
+
+    @property
+    def enabled(self):
+        return not self.headless or bool(self.plots_dir)
+
+    def finish(self, name):
+        if self.headless:
+            plt.savefig(os.path.join(self.plots_dir, f'{name}.png'), dpi=100)
+            plt.close('all')
+        else:
+            plt.show()
+
+
+class PhaseTimer:
+    """Wall-clock seconds per pipeline phase."""
+
+    def __init__(self):
+        self.seconds = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = time.perf_counter() - start
+
+    def report(self):
+        width = max(map(len, self.seconds), default=0)
+        for name, seconds in self.seconds.items():
+            print(f"{name:<{width}} {seconds:8.3f} s")
+        print(f"{'total':<{width}} {sum(self.seconds.values()):8.3f} s")
+
+
+def annotate_bars(ax):
+    for p in ax.patches:
+        ax.annotate(f'{int(p.get_height())}', (p.get_x() + p.get_width() / 2., p.get_height()),
+                    ha='center', va='center', fontsize=10, color='black', xytext=(0, 5),
+                    textcoords='offset points')
+
+
+def plot_target_distribution(data, title, name, figures):
+    if not figures.enabled:
+        return
+    plt.figure(figsize=(10, 6))
+    ax = sns.countplot(x=TARGET, data=data)
+    plt.title(title)
+    annotate_bars(ax)
+    figures.finish(name)
+
+
+def load_data(file_path):
+    # Step 1: Load the dataset in chunks with compact dtypes (category, int8/int16/int32, float32)
+    data = read_credit_data(file_path)
+    print("Memory usage, default dtypes vs compact dtypes (bytes):\n", memory_report(file_path, data))
+
+    # Inspect the data
+    print(data.info())
+    print(data.describe())
+    return data
+
+
+def clean_data(data, figures):
+    # Step 2: Data Cleaning
+    # Check for missing values
+    missing_values = data.isnull().sum()
+    print("Missing values per column:\n", missing_values)
+
+    # Visualize overall missing values with counts
+    if figures.enabled:
+        plt.figure(figsize=(10, 6))
+        ax = missing_values[missing_values > 0].plot(kind='bar', color='skyblue')
+        plt.title("Missing Values per Column")
+        plt.xlabel("Columns")
+        plt.ylabel("Count of Missing Values")
+        plt.xticks(rotation=45, ha='right')
+        annotate_bars(ax)
+        plt.tight_layout()
+        figures.finish('missing_values')
+
+    # Visualize target distribution before cleaning
+    plot_target_distribution(data, 'Credit Risk Distribution (Before Cleaning)', 'target_before_cleaning', figures)
+
+    # Handle missing or invalid target values (-1 treated as missing); a target read with
+    # missing values is float, so restore its integer dtype once they are dropped
+    data = data[data[TARGET].notna() & (data[TARGET] != -1)]
+    data = data.astype({TARGET: NUMERIC_DTYPES[TARGET]})
+
+    # Visualize target distribution after cleaning
+    plot_target_distribution(data, 'Credit Risk Distribution (After Cleaning)', 'target_after_cleaning', figures)
+
+    # Fill missing numerical values with the median
+    return data.fillna(data.median(numeric_only=True))
+
+
+def explore(data, figures):
+    # Step 3: Exploratory Data Analysis (EDA)
+    plot_target_distribution(data, 'Credit Risk Distribution', 'target_distribution', figures)
+
+    # Learn the integer codes of categorical features once; the same encoding is used for modelling
+    category_encoder = CategoryEncoder().fit(data)
+
+    # Correlation heatmap for numeric features
+    if figures.enabled:
+        plt.figure(figsize=(12, 8))
+        sns.heatmap(category_encoder.transform(data).corr(), annot=True, fmt=".2f", cmap="coolwarm")
+        plt.title('Correlation Heatmap')
+        plt.xticks(rotation=45, ha='right')
+        plt.yticks(rotation=0)
+        plt.tight_layout()
+        figures.finish('correlation_heatmap')
+    return category_encoder
+
+
+def split(data, holdout=True):
+    # Step 4: Data Preprocessing
+    # Separating features and target
+    X = data.drop(TARGET, axis=1)
+    y = data[TARGET]
+
+    # Splitting the dataset; without a holdout the forest is evaluated out-of-bag
+    if holdout:
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    else:
+        X_train, X_test, y_train, y_test = X, None, y, None
+    return X_train, X_test, y_train, y_test
+
+
+def encode_and_scale(category_encoder, X_train, X_test):
+    """Categorical codes, then numerical features scaled in float32, in place, without a float64 copy."""
+    scaler = StandardScaler(copy=False)
+    X_train = scaler.fit_transform(category_encoder.transform(X_train).to_numpy(dtype=np.float32))
+    if X_test is not None:
+        X_test = scaler.transform(category_encoder.transform(X_test).to_numpy(dtype=np.float32))
+    return X_train, X_test, scaler
+
+
+def train(X_train, y_train, engine="random_forest", n_jobs=-1):
+    # Step 5: Model Training; the forest uses all cores and bootstrap-left-out rows give the
+    # out-of-bag score, gradient boosting stops early on an internal validation split
+    clf = make_engine(engine, n_jobs=n_jobs)
+    clf.fit(X_train, y_train)
+    if engine == "hist_gradient_boosting":
+        print(f"Early stopping after {clf.n_iter_} of {clf.max_iter} boosting iterations")
+    return clf
+
+
+def evaluate_oob(clf, y_train):
+    """Accuracy and AUC on out-of-bag predictions, with no extra pass over the data."""
+    print("Out-of-bag accuracy:", clf.oob_score_)
+    oob_proba = clf.oob_decision_function_
+    if len(clf.classes_) == 2:
+        print("Out-of-bag AUC-ROC Score:", roc_auc_score(y_train, oob_proba[:, 1]))
+
+
+def evaluate(clf, X_test, y_test, figures):
+    # Step 6: Evaluation
+    predictions = clf.predict(X_test)
+    print("Classification Report:\n", classification_report(y_test, predictions))
+
+    # Confusion Matrix
+    if figures.enabled:
+        cm = confusion_matrix(y_test, predictions)
+        labels = clf.classes_  # Ensure correct class labels sorted
+        plt.figure(figsize=(8, 6))
+        cmd = ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=labels)
+        cmd.plot(cmap='Blues', values_format='d')
+        plt.title('Confusion Matrix')
+        figures.finish('confusion_matrix')
+
+    # AUC-ROC for multi-class classification
+    if len(clf.classes_) > 2:
+        y_pred_proba = clf.predict_proba(X_test)
+        y_test_encoded = LabelEncoder().fit_transform(y_test)
+        auc_score = roc_auc_score(y_test_encoded, y_pred_proba, multi_class='ovr')
+        print("AUC-ROC Score (Multi-class, OVR):", auc_score)
+    else:
+        probs = clf.predict_proba(X_test)[:, 1]
+        auc_score = roc_auc_score(y_test, probs)
+        print("AUC-ROC Score:", auc_score)
+    return auc_score
+
+
+def plot_feature_importance(clf, feature_names, figures):
+    if not figures.enabled or not hasattr(clf, 'feature_importances_'):
+        return
+    importances = clf.feature_importances_
+    indices = np.argsort(importances)[::-1]
+    feature_names = np.asarray(feature_names)
+
+    plt.figure(figsize=(12, 6))
+    plt.title("Feature Importance")
+    ax = plt.bar(range(len(importances)), importances[indices], align="center")
+    plt.xticks(range(len(importances)), feature_names[indices], rotation=45, ha='right')
+    for i, rect in enumerate(ax):
+        plt.text(rect.get_x() + rect.get_width() / 2., rect.get_height(), f'{importances[indices[i]]:.2f}',
+                 ha='center', va='bottom', fontsize=8)
+    plt.tight_layout()
+    figures.finish('feature_importance')
+
+
+def explain(clf, X, y, feature_names, figures, explanations_path, n_jobs=-1):
+    """Per-row path attributions for every row of X, plus sampled permutation importance."""
+    explainer = ForestExplainer(clf, feature_names)
+    attributions = explainer.explain_frame(X)
+    attributions.to_csv(explanations_path, index=False)
+    print(f"Attributions for {len(attributions)} rows saved as:", explanations_path)
+
+    mean_abs = attributions[feature_names].abs().mean().sort_values(ascending=False)
+    print(f"Mean |attribution| per feature (probability of class {clf.classes_[-1]}):\n", mean_abs)
+    print("Permutation importance (drop in ROC AUC):\n",
+          sampled_permutation_importance(clf, X, y, feature_names, n_jobs=n_jobs))
+
+    if figures.enabled:
+        plt.figure(figsize=(12, 6))
+        plt.title("Mean |Attribution| per Feature")
+        plt.bar(range(len(mean_abs)), mean_abs.to_numpy(), align="center")
+        plt.xticks(range(len(mean_abs)), mean_abs.index, rotation=45, ha='right')
+        plt.tight_layout()
+        figures.finish('attributions')
+
+
+def save_artifacts(path, engine, clf, category_encoder, scaler, feature_names):
+    """Everything needed to score new applications: encoder -> scaler -> model.
+
+    Native-categorical engines take the compact frame as read by
+    read_credit_data, so their encoder and scaler are saved as None.
+    """
+    joblib.dump({"engine": engine, "model": clf, "category_encoder": category_encoder, "scaler": scaler,
+                 "features": feature_names}, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default='credit_data.csv')
+    parser.add_argument("--headless", action="store_true",
+                        help="never block on plt.show(); save figures to --plots-dir or skip them")
+    parser.add_argument("--plots-dir", help="folder for figures in headless mode")
+    parser.add_argument("--oob-only", action="store_true",
+                        help="train on every row and evaluate out-of-bag instead of on a test split")
+    parser.add_argument("--engine", choices=ENGINES, default="random_forest")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="cores for the forest (-1 = all)")
+    parser.add_argument("--explain", action="store_true",
+                        help="attribute every test prediction to features (random_forest engine)")
+    parser.add_argument("--explanations-path", default=EXPLANATIONS_PATH)
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--timings-path", default=TIMINGS_PATH)
+    args = parser.parse_args()
+    native_categorical = args.engine in NATIVE_CATEGORICAL_ENGINES
+    if args.oob_only and args.engine != "random_forest":
+        parser.error("--oob-only needs the random_forest engine")
+    if args.explain and args.engine != "random_forest":
+        parser.error("--explain needs the random_forest engine")
+    if args.explain and args.oob_only:
+        # Permutation importance on the training rows would be inflated by what the forest memorized
+        parser.error("--explain needs a held-out test split; drop --oob-only")
+
+    figures = Figures(headless=args.headless, plots_dir=args.plots_dir)
+    timer = PhaseTimer()
+
+    with timer.phase("load"):
+        data = load_data(args.data)
+    with timer.phase("clean"):
+        data = clean_data(data, figures)
+    with timer.phase("eda_and_encode"):
+        category_encoder = explore(data, figures)
+    with timer.phase("split_and_scale"):
+        X_train, X_test, y_train, y_test = split(data, holdout=not args.oob_only)
+        feature_names = list(X_train.columns)
+        if native_categorical:
+            category_encoder, scaler = None, None
+        else:
+            X_train, X_test, scaler = encode_and_scale(category_encoder, X_train, X_test)
+    with timer.phase("train"):
+        clf = train(X_train, y_train, engine=args.engine, n_jobs=args.n_jobs)
+    with timer.phase("evaluate"):
+        if args.engine == "random_forest":
+            evaluate_oob(clf, y_train)
+        if X_test is not None:
+            evaluate(clf, X_test, y_test, figures)
+        plot_feature_importance(clf, feature_names, figures)
+    if args.explain:
+        with timer.phase("explain"):
+            explain(clf, X_test, y_test, feature_names, figures, args.explanations_path, args.n_jobs)
+    with timer.phase("save"):
+        save_artifacts(args.model_path, args.engine, clf, category_encoder, scaler, feature_names)
+    print("Model, category encoder and scaler saved as:", args.model_path)
+
+    timer.report()
+    with open(args.timings_path, 'w') as f:
+        json.dump(timer.seconds, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
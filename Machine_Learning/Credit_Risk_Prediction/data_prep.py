@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+TARGET = 'credit_risk'
+
+# Attribute codes such as 'A11' or 'A173'; stored as category, one byte per row for the codes
+CATEGORICAL_COLUMNS = [
+    'account_status', 'credit_history', 'purpose', 'savings', 'employment',
+    'gender_and_marital_status', 'guarantors', 'property', 'other_installments',
+    'housing_type', 'occupation', 'phone', 'foreign_worker',
+]
+
+# Smallest dtype that holds each numeric column. An integer column with missing
+# values is widened to a float type instead (see read_credit_data).
+NUMERIC_DTYPES = {
+    'duration': 'int16',
+    'credit_amount': 'int32',
+    'installment_rate': 'int8',
+    'residence_duration': 'int8',
+    'age': 'float32',
+    'number_of_credits': 'int8',
+    'number_of_dependants': 'int8',
+    TARGET: 'int8',
+}
+
+DTYPES = {**NUMERIC_DTYPES, **{column: 'category' for column in CATEGORICAL_COLUMNS}}
+
+# Integer columns are left to pandas' default parsing (a missing value turns a chunk's column
+# into float64) and compacted per chunk, so a missing value never makes read_csv raise
+READ_DTYPES = {column: dtype for column, dtype in DTYPES.items()
+               if dtype == 'category' or np.dtype(dtype).kind == 'f'}
+
+
+def _missing_dtype(dtype):
+    """Float type that holds every value of an integer dtype, plus NaN for missing values."""
+    return np.dtype('float32') if np.dtype(dtype).itemsize <= 2 else np.dtype('float64')
+
+
+def _compact(values, dtype):
+    """values as dtype; an integer dtype is widened, never wrapped, to hold out-of-range and missing values."""
+    dtype = np.dtype(dtype)
+    if dtype.kind in 'iu':
+        low, high = values.min(), values.max()
+        while low < np.iinfo(dtype).min or high > np.iinfo(dtype).max:
+            dtype = np.dtype(f'int{dtype.itemsize * 16}')
+        if values.isna().any():
+            dtype = _missing_dtype(dtype)
+    return values.to_numpy(dtype=dtype)
+
+
+def _union_categoricals(parts):
+    """union_categoricals with sorted categories, across chunks where a column may be all missing.
+
+    An all-missing chunk has empty float categories, which union_categoricals
+    rejects; it is given the category dtype of the other chunks first.
+    """
+    dtype = next((part.categories.dtype for part in parts if len(part.categories)), None)
+    if dtype is not None:
+        parts = [part if len(part.categories) else part.set_categories(pd.Index([], dtype=dtype))
+                 for part in parts]
+    return union_categoricals(parts, sort_categories=True)
+
+
+def read_credit_data(file_path, chunksize=1_000_000):
+    """Read the CSV in chunks with compact dtypes.
+
+    Each chunk is turned into compact arrays (category, int8/int16/int32,
+    float32) and then dropped. Only one chunk is ever held with default
+    dtypes, and the full file is never materialized with int64/object
+    columns. Integer columns with missing values become float32 (float64
+    for int32 columns) instead of raising; values outside the declared
+    integer range widen the dtype. Columns are merged one at a time,
+    freeing each column's parts as it goes, so peak memory stays close to the
+    compact frame itself. Categories are merged with union_categoricals and
+    sorted, giving the same codes as LabelEncoder.
+    """
+    parts = {}
+    for chunk in pd.read_csv(file_path, dtype=READ_DTYPES, chunksize=chunksize):
+        for column in chunk.columns:
+            if column in CATEGORICAL_COLUMNS:
+                part = chunk[column].array
+            elif column in NUMERIC_DTYPES:
+                part = _compact(chunk[column], NUMERIC_DTYPES[column])
+            else:
+                part = chunk[column].to_numpy()
+            parts.setdefault(column, []).append(part)
+        del chunk
+
+    columns = {}
+    for column in list(parts):
+        column_parts = parts.pop(column)
+        if column in CATEGORICAL_COLUMNS:
+            columns[column] = _union_categoricals(column_parts)
+        else:
+            dtype = np.result_type(*column_parts)
+            columns[column] = column_parts[0] if len(column_parts) == 1 else np.concatenate(column_parts, dtype=dtype)
+        del column_parts
+    return pd.DataFrame(columns, copy=False)
+
+
+def memory_report(file_path, data, sample_rows=100_000):
+    """Memory of the compact frame vs. a default pd.read_csv, per column.
+
+    The default-dtype size is measured on the first sample_rows rows and
+    scaled to the full row count, so the report never loads the whole file
+    with default dtypes.
+    """
+    sample = pd.read_csv(file_path, nrows=sample_rows)
+    scale = len(data) / max(len(sample), 1)
+    report = pd.DataFrame({
+        'default_dtype': sample.dtypes.astype(str),
+        'default_bytes': (sample.memory_usage(deep=True, index=False) * scale).round().astype('int64'),
+        'compact_dtype': data.dtypes.astype(str),
+        'compact_bytes': data.memory_usage(deep=True, index=False),
+    })
+    report.loc['total'] = ['', report['default_bytes'].sum(), '', report['compact_bytes'].sum()]
+    return report
+
+
+class CategoryEncoder:
+    """Integer codes for the categorical columns, learned once and reused.
+
+    Codes follow the sorted categories (as LabelEncoder would assign them);
+    missing and unseen values get -1. The same fitted encoder serves the
+    correlation analysis, model training and later scoring.
+    """
+
+    def fit(self, data):
+        self.categories_ = {column: data[column].astype('category').cat.categories
+                            for column in CATEGORICAL_COLUMNS if column in data}
+        return self
+
+    def transform(self, data):
+        codes = {column: pd.Categorical(data[column], categories=categories).codes
+                 for column, categories in self.categories_.items()}
+        return data.assign(**codes)
+
+    def fit_transform(self, data):
+        return self.fit(data).transform(data)
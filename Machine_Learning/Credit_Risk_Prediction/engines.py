@@ -0,0 +1,29 @@
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+
+# Interchangeable model engines for casestudy.py and benchmark_engines.py
+ENGINES = ("random_forest", "hist_gradient_boosting")
+
+# Engines that consume the raw frame (category dtype columns) instead of encoded, scaled arrays
+NATIVE_CATEGORICAL_ENGINES = ("hist_gradient_boosting",)
+
+
+def make_engine(engine="random_forest", n_jobs=-1, random_state=42, max_iter=500, validation_fraction=0.1,
+                n_iter_no_change=20):
+    """A fresh, unfitted classifier for the given engine.
+
+    random_forest is the case study's forest, trained on all cores with an
+    out-of-bag score. It expects CategoryEncoder codes.
+    hist_gradient_boosting bins the features into histograms. It reads
+    categorical columns straight from their pandas category dtype, so no
+    label or one-hot encoding and no scaling are needed. Boosting stops once
+    the loss on an internal validation split (validation_fraction) has not
+    improved for n_iter_no_change iterations, or after max_iter iterations.
+    """
+    if engine == "random_forest":
+        return RandomForestClassifier(random_state=random_state, n_jobs=n_jobs, oob_score=True)
+    if engine == "hist_gradient_boosting":
+        return HistGradientBoostingClassifier(
+            categorical_features="from_dtype", max_iter=max_iter, early_stopping=True,
+            validation_fraction=validation_fraction, n_iter_no_change=n_iter_no_change,
+            random_state=random_state)
+    raise ValueError(f"Unknown engine: {engine}")
@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_prep import read_credit_data
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), 'credit_data.csv')
+
+
+@pytest.fixture(scope='module')
+def raw():
+    return pd.read_csv(DATA_PATH)
+
+
+@pytest.mark.parametrize("chunksize", [50, 137, 1000])
+def test_chunked_read_matches_single_read(chunksize):
+    pd.testing.assert_frame_equal(read_credit_data(DATA_PATH, chunksize=chunksize), read_credit_data(DATA_PATH))
+
+
+def test_categorical_column_missing_in_a_whole_chunk(raw, tmp_path):
+    data = raw.copy()
+    data.loc[0:99, 'occupation'] = np.nan
+    path = tmp_path / 'credit_data.csv'
+    data.to_csv(path, index=False)
+
+    chunked = read_credit_data(path, chunksize=100)
+    pd.testing.assert_frame_equal(chunked, read_credit_data(path))
+    assert chunked['occupation'][:100].isna().all()
+    assert list(chunked['occupation'].cat.categories) == sorted(raw['occupation'].dropna().unique())
+
+
+def test_integer_columns_widen_instead_of_wrapping_or_raising(raw, tmp_path):
+    data = raw.copy()
+    data.loc[3, 'installment_rate'] = 300
+    data.loc[5, 'duration'] = np.nan
+    path = tmp_path / 'credit_data.csv'
+    data.to_csv(path, index=False)
+
+    compact = read_credit_data(path, chunksize=100)
+    assert compact['installment_rate'][3] == 300
+    assert compact['installment_rate'].dtype == np.int16
+    assert compact['duration'].isna().sum() == 1
+    assert compact['duration'].dtype == np.float32
+    assert compact['number_of_credits'].dtype == np.int8
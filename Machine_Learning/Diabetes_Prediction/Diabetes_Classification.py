@@ -1,16 +1,20 @@
+import argparse
+import json
+import os
+
+import joblib
 import numpy as np
-import pandas as pd
-from sklearn.model_selection import train_test_split
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, AdaBoostClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.svm import SVC
-from sklearn.metrics import classification_report, roc_auc_score, roc_curve, confusion_matrix, ConfusionMatrixDisplay
-from sklearn.preprocessing import PolynomialFeatures, StandardScaler
-import matplotlib.pyplot as plt
-from imblearn.over_sampling import SMOTE
-from docx import Document
-from docx.shared import Inches
-import os
+from sklearn.metrics import classification_report, roc_auc_score, roc_curve, confusion_matrix
+
+import preprocessing
+import render_reports
+from fast_svc import SVC_BACKENDS, make_fast_svc
 
 # List of different random seeds for reproducibility
 seeds = [42, 123, 456]  # You can add more seeds here
@@ -24,41 +28,25 @@ classifiers = {
     "SVC": SVC(probability=True, random_state=42)
 }
 
-
-# Initialize a document for overall results
-overall_doc = Document()
-overall_doc.add_heading('Diabetes Classification Results Overview', level=1)
-
 # Define the supervised learning function
-def run_supervised_learning_process(classifier_name, classifier, seed, base_folder):
+def run_supervised_learning_process(classifier_name, classifier, seed, base_folder, data_folder):
+    """Train and evaluate one (classifier, seed) run and save its metrics and model.
+
+    Fits a fresh clone of ``classifier`` so parallel runs never share state,
+    and returns the run's results instead of writing to the overall report.
+    The preprocessed arrays are memory-mapped from ``data_folder``
+    (see preprocessing.prepare).
+    """
     print(f"\nRunning supervised learning process for {classifier_name} with seed {seed}...\n")
+    classifier = clone(classifier)
 
     # Set the random seed for reproducibility
     np.random.seed(seed)
 
-    # Load the dataset
-    df = pd.read_csv('diabetes.csv')
-
-    # Extract features and target variable
-    X = df.drop(columns=['Outcome'])
-    y = df['Outcome']
-
-    # Initialize SMOTE to balance the dataset
-    smote = SMOTE(random_state=seed)
-    X_resampled, y_resampled = smote.fit_resample(X, y)
-
-    # Split the dataset into training and testing sets
-    X_train, X_test, y_train, y_test = train_test_split(X_resampled, y_resampled, test_size=0.3, random_state=seed)
-
-    # Feature Engineering: Create polynomial features
-    poly = PolynomialFeatures(degree=2, interaction_only=True, include_bias=False)
-    X_train_poly = poly.fit_transform(X_train)
-    X_test_poly = poly.transform(X_test)
-
-    # Optional: Scale features
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train_poly)
-    X_test_scaled = scaler.transform(X_test_poly)
+    # Resampled, expanded and scaled arrays shared by every classifier for this seed
+    data = preprocessing.load(data_folder)
+    X_train_scaled, X_test_scaled = data["X_train"], data["X_test"]
+    y_train, y_test = data["y_train"], data["y_test"]
 
     # Train the specified classifier on the labeled portion of the training data
     classifier.fit(X_train_scaled, y_train)
@@ -73,76 +61,77 @@ def run_supervised_learning_process(classifier_name, classifier, seed, base_fold
     print(f"\nEvaluation for {classifier_name} completed.")
     print(f"ROC AUC Score: {roc_auc}\n")
 
-    # Plot ROC curve
+    # Compact metric artifacts; plots and Word reports are rendered from them by render_reports.py
     fpr, tpr, thresholds = roc_curve(y_test, y_test_proba)
-    plt.figure()
-    plt.plot(fpr, tpr, color='blue', lw=2, label='ROC curve (area = %0.2f)' % roc_auc)
-    plt.plot([0, 1], [0, 1], color='red', lw=2, linestyle='--')
-    plt.xlim([0.0, 1.0])
-    plt.ylim([0.0, 1.05])
-    plt.xlabel('False Positive Rate')
-    plt.ylabel('True Positive Rate')
-    plt.title(f'Receiver Operating Characteristic ({classifier_name})')
-    roc_curve_plot_path = f'{base_folder}/roc_curve_{classifier_name}_seed_{seed}.png'
-    plt.savefig(roc_curve_plot_path)
-    plt.close()  # Close the figure
-
-    # Confusion Matrix
-    cm = confusion_matrix(y_test, y_test_pred)
-    disp = ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=classifier.classes_)
-    confusion_matrix_plot_path = f'{base_folder}/confusion_matrix_{classifier_name}_seed_{seed}.png'
-    disp.plot(cmap=plt.cm.Blues)
-    plt.title(f'Confusion Matrix ({classifier_name})')
-    plt.savefig(confusion_matrix_plot_path)
-    plt.close()  # Close the figure
-
-    # Create a Word document for the current classifier
-    doc = Document()
-    doc.add_heading(f'Diabetes Classification Results using {classifier_name}', level=1)
-
-    # Add classification report
-    doc.add_heading('Classification Report:', level=2)
-    doc.add_paragraph(classification_report(y_test, y_test_pred))
-
-    # Add ROC AUC score
-    doc.add_heading('ROC AUC Score:', level=2)
-    doc.add_paragraph(f'ROC AUC Score ({classifier_name}): {roc_auc}')
-
-    # Add ROC curve plot to document
-    doc.add_heading('ROC Curve:', level=2)
-    doc.add_picture(roc_curve_plot_path, width=Inches(5.0))
-
-    # Add confusion matrix
-    doc.add_heading('Confusion Matrix:', level=2)
-    doc.add_paragraph(f'True Negatives: {cm[0][0]}')
-    doc.add_paragraph(f'False Positives: {cm[0][1]}')
-    doc.add_paragraph(f'False Negatives: {cm[1][0]}')
-    doc.add_paragraph(f'True Positives: {cm[1][1]}')
-
-    # Add confusion matrix plot to document
-    doc.add_heading('Confusion Matrix Plot:', level=2)
-    doc.add_picture(confusion_matrix_plot_path, width=Inches(5.0))
-
-    # Save the document for the current classifier
-    classifier_doc_path = f'{base_folder}/{classifier_name}_seed_{seed}_supervised.docx'
-    doc.save(classifier_doc_path)
-
-    # Append the results to the overall document
-    overall_doc.add_heading(f'Results for {classifier_name} (Seed {seed})', level=2)
-    overall_doc.add_paragraph(f'ROC AUC Score: {roc_auc}')
-    overall_doc.add_paragraph(f'Document saved as: {classifier_doc_path}')
-
-# Loop through all seeds
-for seed in seeds:
-    # Loop through all classifiers
-    for classifier_name, classifier in classifiers.items():
-        base_folder = f'{classifier_name}_Supervised'  # Base folder for each classifier
-        os.makedirs(base_folder, exist_ok=True)  # Create the base folder
-        run_supervised_learning_process(classifier_name, classifier, seed, base_folder)
-
-# Save the consolidated overall document
-overall_doc_path = 'diabetes_classification_overall_results_supervised.docx'
-overall_doc.save(overall_doc_path)
-
-print("All classifier results have been saved successfully!")
-print(f"Overall document saved as: {overall_doc_path}")
+    metrics = {
+        "classifier": classifier_name,
+        "seed": seed,
+        "roc_auc": roc_auc,
+        "fpr": fpr.tolist(),
+        "tpr": tpr.tolist(),
+        "confusion_matrix": confusion_matrix(y_test, y_test_pred).tolist(),
+        "classes": classifier.classes_.tolist(),
+        "classification_report": classification_report(y_test, y_test_pred),
+    }
+    metrics_path = f'{base_folder}/metrics_{classifier_name}_seed_{seed}.json'
+    with open(metrics_path, 'w') as f:
+        json.dump(metrics, f)
+
+    # Save the full pipeline (polynomial features, scaler, classifier) so raw rows can be scored later
+    transformers = preprocessing.load_transformers(data_folder)
+    model = Pipeline([("poly", transformers["poly"]), ("scaler", transformers["scaler"]), ("clf", classifier)])
+    model_path = f'{base_folder}/model_{classifier_name}_seed_{seed}.joblib'
+    joblib.dump(model, model_path)
+
+    return {"classifier": classifier_name, "seed": seed, "roc_auc": roc_auc,
+            "metrics_path": metrics_path, "model_path": model_path}
+
+
+def run_experiments(classifiers, seeds, n_jobs=-1):
+    """Run every (seed, classifier) combination across a process pool.
+
+    Preprocessing runs once per seed before the jobs are dispatched, and
+    every classifier for that seed reuses the cached arrays. Results come
+    back in the same order as the sequential nested loops (seeds outer,
+    classifiers inner), whatever order the jobs finish in.
+    """
+    data_folders = {seed: preprocessing.prepare(seed) for seed in seeds}
+    jobs = [(classifier_name, classifier, seed, f'{classifier_name}_Supervised', data_folders[seed])
+            for seed in seeds for classifier_name, classifier in classifiers.items()]
+    for classifier_name in classifiers:
+        os.makedirs(f'{classifier_name}_Supervised', exist_ok=True)  # Create the base folder
+    return Parallel(n_jobs=n_jobs)(delayed(run_supervised_learning_process)(*job) for job in jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and report every classifier for every seed.")
+    parser.add_argument("--n-jobs", type=int, default=-1,
+                        help="parallel (classifier, seed) runs; -1 uses all cores, 1 runs sequentially")
+    parser.add_argument("--metrics-only", action="store_true",
+                        help="only save metrics; render plots and reports later with render_reports.py")
+    parser.add_argument("--svc-backend", choices=SVC_BACKENDS, default="exact",
+                        help="exact SVC(probability=True) or a calibrated kernel approximation for large data")
+    args = parser.parse_args()
+
+    models = classifiers
+    if args.svc_backend != "exact":
+        # Reported under its own name, so its outputs don't overwrite the exact SVC's
+        models = {(f"SVC_{args.svc_backend}" if name == "SVC" else name):
+                  (make_fast_svc(args.svc_backend) if name == "SVC" else classifier)
+                  for name, classifier in classifiers.items()}
+
+    results = run_experiments(models, seeds, n_jobs=args.n_jobs)
+    with open(render_reports.SUMMARY_PATH, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Metrics for {len(results)} runs saved; summary: {render_reports.SUMMARY_PATH}")
+    if args.metrics_only:
+        return
+
+    # Plots, per-run documents and the consolidated overall document
+    render_reports.render_all(results, n_jobs=args.n_jobs)
+    print("All classifier results have been saved successfully!")
+    print(f"Overall document saved as: {render_reports.OVERALL_DOC_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Fit/predict time and ROC AUC: SVC(probability=True) vs calibrated kernel approximations.
+
+diabetes.csv is split 70/30 first. Then the train and test parts are each
+grown to the requested size by resampling their own rows with a small
+Gaussian jitter, which keeps the class structure. Test rows are never
+near-copies of training rows, so approximation losses show up in the AUC.
+Both parts get the same polynomial features and scaling as training. The
+exact SVC is skipped above --exact-max-rows because its cost grows
+super-linearly:
+
+    python benchmark_svc.py --rows 1000 5000 20000 100000 --exact-max-rows 20000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import PolynomialFeatures, StandardScaler
+from sklearn.svm import SVC
+
+from fast_svc import make_fast_svc
+from preprocessing import PREPROCESSING
+
+
+def load_split(seed=42, config=PREPROCESSING, data_path='diabetes.csv'):
+    """Stratified train/test split of the original rows, before any resampling."""
+    df = pd.read_csv(data_path)
+    X = df.drop(columns=['Outcome']).to_numpy(dtype=float)
+    y = df['Outcome'].to_numpy()
+    return train_test_split(X, y, test_size=config["test_size"], stratify=y, random_state=seed)
+
+
+def grow_dataset(X, y, n_rows, seed=42, noise=0.05):
+    """Bootstrap n_rows from (X, y) and jitter every feature by noise * its std."""
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(X), n_rows)
+    return X[idx] + rng.normal(0.0, noise, (n_rows, X.shape[1])) * X.std(axis=0), y[idx]
+
+
+def prepare(X_train, X_test, config=PREPROCESSING):
+    poly = PolynomialFeatures(degree=config["degree"], interaction_only=config["interaction_only"],
+                              include_bias=False)
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(poly.fit_transform(X_train))
+    X_test = scaler.transform(poly.transform(X_test))
+    return X_train, X_test
+
+
+def benchmark(model, X_train, X_test, y_train, y_test):
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    proba = model.predict_proba(X_test)[:, 1]
+    predict_seconds = time.perf_counter() - start
+    return fit_seconds, predict_seconds, roc_auc_score(y_test, proba)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 20000, 100000])
+    parser.add_argument("--exact-max-rows", type=int, default=20000)
+    parser.add_argument("--n-components", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    models = {
+        "SVC(probability=True)": lambda: SVC(probability=True, random_state=args.seed),
+        "Nystroem + LinearSVC": lambda: make_fast_svc("nystroem", "linearsvc", args.n_components,
+                                                      random_state=args.seed),
+        "RBFSampler + LinearSVC": lambda: make_fast_svc("rbf_sampler", "linearsvc", args.n_components,
+                                                        random_state=args.seed),
+        "Nystroem + SGD": lambda: make_fast_svc("nystroem", "sgd", args.n_components, random_state=args.seed),
+    }
+
+    X_base_train, X_base_test, y_base_train, y_base_test = load_split(args.seed)
+    test_share = PREPROCESSING["test_size"]
+
+    print(f"{'rows':>8} {'model':<24} {'fit s':>8} {'predict s':>10} {'pred rows/s':>12} {'ROC AUC':>8}")
+    for n_rows in args.rows:
+        n_test = int(round(n_rows * test_share))
+        X_train, y_train = grow_dataset(X_base_train, y_base_train, n_rows - n_test, args.seed)
+        X_test, y_test = grow_dataset(X_base_test, y_base_test, n_test, args.seed + 1)
+        X_train, X_test = prepare(X_train, X_test)
+        for name, make_model in models.items():
+            if name.startswith("SVC") and n_rows > args.exact_max_rows:
+                print(f"{n_rows:>8} {name:<24} {'skipped (> --exact-max-rows)':>40}")
+                continue
+            fit_seconds, predict_seconds, auc = benchmark(make_model(), X_train, X_test, y_train, y_test)
+            print(f"{n_rows:>8} {name:<24} {fit_seconds:>8.2f} {predict_seconds:>10.3f} "
+                  f"{len(X_test) / predict_seconds:>12.0f} {auc:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
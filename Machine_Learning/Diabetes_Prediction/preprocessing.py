@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+from imblearn.over_sampling import SMOTE
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import PolynomialFeatures, StandardScaler
+
+# Preprocessing shared by every classifier; part of the cache key
+PREPROCESSING = {"test_size": 0.3, "degree": 2, "interaction_only": True}
+CACHE_DIR = 'preprocess_cache'
+ARRAYS = ("X_train", "X_test", "y_train", "y_test")
+TRANSFORMERS_FILE = 'transformers.joblib'
+CACHE_FORMAT = 2  # bump when the contents of a cache entry change
+
+
+def preprocess(seed, data_path='diabetes.csv', config=PREPROCESSING):
+    """SMOTE, train/test split, polynomial features and scaling for one seed.
+
+    Returns (arrays, transformers): the arrays dict and the fitted
+    PolynomialFeatures and StandardScaler, which a saved model needs to
+    score raw rows.
+    """
+    # Load the dataset
+    df = pd.read_csv(data_path)
+
+    # Extract features and target variable
+    X = df.drop(columns=['Outcome'])
+    y = df['Outcome']
+
+    # Initialize SMOTE to balance the dataset
+    smote = SMOTE(random_state=seed)
+    X_resampled, y_resampled = smote.fit_resample(X, y)
+
+    # Split the dataset into training and testing sets
+    X_train, X_test, y_train, y_test = train_test_split(
+        X_resampled, y_resampled, test_size=config["test_size"], random_state=seed)
+
+    # Feature Engineering: Create polynomial features
+    poly = PolynomialFeatures(degree=config["degree"], interaction_only=config["interaction_only"],
+                              include_bias=False)
+    X_train_poly = poly.fit_transform(X_train)
+    X_test_poly = poly.transform(X_test)
+
+    # Optional: Scale features
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train_poly)
+    X_test_scaled = scaler.transform(X_test_poly)
+
+    arrays = {"X_train": X_train_scaled, "X_test": X_test_scaled,
+              "y_train": np.asarray(y_train), "y_test": np.asarray(y_test)}
+    return arrays, {"poly": poly, "scaler": scaler}
+
+
+def cache_key(seed, data_path='diabetes.csv', config=PREPROCESSING):
+    """Hash of the dataset contents, the seed and the preprocessing config."""
+    digest = hashlib.sha1()
+    with open(data_path, 'rb') as f:
+        digest.update(f.read())
+    digest.update(json.dumps({"seed": seed, "format": CACHE_FORMAT, **config}, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def prepare(seed, data_path='diabetes.csv', config=PREPROCESSING, cache_dir=CACHE_DIR):
+    """Compute the arrays for a seed once and store them as .npy; returns the folder.
+
+    The fitted transformers are stored next to them. Later calls with the
+    same dataset, seed and config reuse the stored arrays. Files are written
+    to a temporary folder and renamed, so a reader never sees a partial
+    cache entry.
+    """
+    folder = os.path.join(cache_dir, f'seed_{seed}_{cache_key(seed, data_path, config)}')
+    if os.path.isdir(folder):
+        return folder
+    tmp_folder = f'{folder}.tmp{os.getpid()}'
+    os.makedirs(tmp_folder, exist_ok=True)
+    arrays, transformers = preprocess(seed, data_path, config)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_folder, f'{name}.npy'), array)
+    joblib.dump(transformers, os.path.join(tmp_folder, TRANSFORMERS_FILE))
+    try:
+        os.rename(tmp_folder, folder)
+    except OSError:  # another process stored the same entry first
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+    return folder
+
+
+def load(folder):
+    """Memory-map the cached arrays read-only, so parallel workers share pages instead of copies."""
+    return {name: np.load(os.path.join(folder, f'{name}.npy'), mmap_mode='r') for name in ARRAYS}
+
+
+def load_transformers(folder):
+    """The fitted PolynomialFeatures and StandardScaler for a cache entry."""
+    return joblib.load(os.path.join(folder, TRANSFORMERS_FILE))
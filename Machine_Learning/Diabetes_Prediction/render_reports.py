@@ -0,0 +1,122 @@
+"""Render the PNG plots and Word reports from saved training metrics.
+
+Diabetes_Classification.py writes one metrics JSON per (classifier, seed) run
+and a summary listing them. This script turns those into the ROC curve and
+confusion-matrix images, the per-run .docx files and the overall document,
+rendering runs in parallel:
+
+    python Diabetes_Classification.py --metrics-only
+    python render_reports.py --n-jobs 4
+"""
+import argparse
+import json
+import os
+
+import matplotlib
+matplotlib.use("Agg")  # headless backend, also in the worker processes
+import matplotlib.pyplot as plt
+import numpy as np
+from docx import Document
+from docx.shared import Inches
+from joblib import Parallel, delayed
+from sklearn.metrics import ConfusionMatrixDisplay
+
+SUMMARY_PATH = 'diabetes_classification_metrics.json'
+OVERALL_DOC_PATH = 'diabetes_classification_overall_results_supervised.docx'
+
+
+def render_run(metrics_path):
+    """Write the ROC curve, confusion matrix plot and Word report for one run; returns the .docx path."""
+    with open(metrics_path) as f:
+        metrics = json.load(f)
+    classifier_name, seed, roc_auc = metrics["classifier"], metrics["seed"], metrics["roc_auc"]
+    base_folder = os.path.dirname(metrics_path)
+
+    # Plot ROC curve
+    plt.figure()
+    plt.plot(metrics["fpr"], metrics["tpr"], color='blue', lw=2, label='ROC curve (area = %0.2f)' % roc_auc)
+    plt.plot([0, 1], [0, 1], color='red', lw=2, linestyle='--')
+    plt.xlim([0.0, 1.0])
+    plt.ylim([0.0, 1.05])
+    plt.xlabel('False Positive Rate')
+    plt.ylabel('True Positive Rate')
+    plt.title(f'Receiver Operating Characteristic ({classifier_name})')
+    roc_curve_plot_path = f'{base_folder}/roc_curve_{classifier_name}_seed_{seed}.png'
+    plt.savefig(roc_curve_plot_path)
+    plt.close()  # Close the figure
+
+    # Confusion Matrix
+    cm = np.array(metrics["confusion_matrix"])
+    disp = ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=metrics["classes"])
+    confusion_matrix_plot_path = f'{base_folder}/confusion_matrix_{classifier_name}_seed_{seed}.png'
+    disp.plot(cmap=plt.cm.Blues)
+    plt.title(f'Confusion Matrix ({classifier_name})')
+    plt.savefig(confusion_matrix_plot_path)
+    plt.close()  # Close the figure
+
+    # Create a Word document for the current classifier
+    doc = Document()
+    doc.add_heading(f'Diabetes Classification Results using {classifier_name}', level=1)
+
+    # Add classification report
+    doc.add_heading('Classification Report:', level=2)
+    doc.add_paragraph(metrics["classification_report"])
+
+    # Add ROC AUC score
+    doc.add_heading('ROC AUC Score:', level=2)
+    doc.add_paragraph(f'ROC AUC Score ({classifier_name}): {roc_auc}')
+
+    # Add ROC curve plot to document
+    doc.add_heading('ROC Curve:', level=2)
+    doc.add_picture(roc_curve_plot_path, width=Inches(5.0))
+
+    # Add confusion matrix
+    doc.add_heading('Confusion Matrix:', level=2)
+    doc.add_paragraph(f'True Negatives: {cm[0][0]}')
+    doc.add_paragraph(f'False Positives: {cm[0][1]}')
+    doc.add_paragraph(f'False Negatives: {cm[1][0]}')
+    doc.add_paragraph(f'True Positives: {cm[1][1]}')
+
+    # Add confusion matrix plot to document
+    doc.add_heading('Confusion Matrix Plot:', level=2)
+    doc.add_picture(confusion_matrix_plot_path, width=Inches(5.0))
+
+    # Save the document for the current classifier
+    classifier_doc_path = f'{base_folder}/{classifier_name}_seed_{seed}_supervised.docx'
+    doc.save(classifier_doc_path)
+    return classifier_doc_path
+
+
+def write_overall_report(results, overall_doc_path=OVERALL_DOC_PATH):
+    # Initialize a document for overall results
+    overall_doc = Document()
+    overall_doc.add_heading('Diabetes Classification Results Overview', level=1)
+    for result in results:
+        overall_doc.add_heading(f'Results for {result["classifier"]} (Seed {result["seed"]})', level=2)
+        overall_doc.add_paragraph(f'ROC AUC Score: {result["roc_auc"]}')
+        overall_doc.add_paragraph(f'Document saved as: {result["doc_path"]}')
+    overall_doc.save(overall_doc_path)
+
+
+def render_all(results, n_jobs=-1, overall_doc_path=OVERALL_DOC_PATH):
+    """Render every run in parallel, then the overall document in the order of results."""
+    doc_paths = Parallel(n_jobs=n_jobs)(delayed(render_run)(result["metrics_path"]) for result in results)
+    results = [{**result, "doc_path": doc_path} for result, doc_path in zip(results, doc_paths)]
+    write_overall_report(results, overall_doc_path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--summary", default=SUMMARY_PATH, help="summary written by Diabetes_Classification.py")
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    with open(args.summary) as f:
+        results = json.load(f)
+    render_all(results, n_jobs=args.n_jobs)
+    print(f"Rendered {len(results)} reports; overall document saved as: {OVERALL_DOC_PATH}")
+
+
+if __name__ == "__main__":
+    main()
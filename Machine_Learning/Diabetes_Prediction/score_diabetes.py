@@ -0,0 +1,105 @@
+"""Score patients with a saved Diabetes model pipeline.
+
+Models are saved by Diabetes_Classification.py as
+<Classifier>_Supervised/model_<Classifier>_seed_<seed>.joblib (polynomial
+features, scaler and classifier). Large CSVs are streamed in chunks, so
+memory stays bounded by --chunksize, and each chunk is scored with one
+vectorized predict_proba call. A single record is scored on the already
+loaded pipeline:
+
+    python score_diabetes.py --model RandomForest_Supervised/model_RandomForest_seed_42.joblib \\
+        --input patients.csv --output scores.csv --chunksize 100000
+    python score_diabetes.py --model ... --record '{"Pregnancies": 2, "Glucose": 138, ...}'
+    python score_diabetes.py --model ... --benchmark-single 1000
+"""
+import argparse
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn import config_context
+
+
+class DiabetesScorer:
+    """A loaded model pipeline with batch, streaming and single-record scoring."""
+
+    def __init__(self, model_path, threshold=0.5):
+        self.model = joblib.load(model_path)
+        self.features = list(self.model.feature_names_in_)
+        self.threshold = threshold
+
+    def score_frame(self, df):
+        """Probability of diabetes for every row; extra columns such as Outcome are ignored.
+
+        Rows with missing or infinite feature values raise ValueError. They are
+        checked once here, so the pipeline steps can skip their own checks.
+        """
+        features = df[self.features]
+        finite = np.isfinite(features.to_numpy(dtype=np.float64)).all(axis=1)
+        if not finite.all():
+            rows = features.index[~finite]
+            raise ValueError(f"missing or infinite feature values in {len(rows)} of {len(features)} rows, "
+                             f"e.g. rows {list(rows[:5])}")
+        with config_context(assume_finite=True):
+            return self.model.predict_proba(features)[:, 1]
+
+    def score_record(self, record):
+        """Low-latency path for one patient given as a {feature: value} dict."""
+        row = pd.DataFrame([[record[name] for name in self.features]], columns=self.features)
+        probability = float(self.score_frame(row)[0])
+        return {"probability": probability, "prediction": int(probability >= self.threshold)}
+
+    def score_csv(self, input_path, output_path, chunksize=100000):
+        """Stream input_path in chunks and append probability/prediction columns to output_path."""
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        rows, start = 0, time.perf_counter()
+        for chunk in pd.read_csv(input_path, chunksize=chunksize):
+            probabilities = self.score_frame(chunk)
+            chunk["probability"] = probabilities
+            chunk["prediction"] = (probabilities >= self.threshold).astype(np.int8)
+            chunk.to_csv(output_path, mode='a', header=rows == 0, index=False)
+            rows += len(chunk)
+        seconds = time.perf_counter() - start
+        return {"rows": rows, "seconds": seconds, "rows_per_second": rows / seconds if seconds else float("inf")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", required=True, help="saved .joblib model pipeline")
+    parser.add_argument("--input", help="CSV with the diabetes.csv feature columns")
+    parser.add_argument("--output", default="scores.csv")
+    parser.add_argument("--chunksize", type=int, default=100000)
+    parser.add_argument("--record", help="score one patient given as a JSON object")
+    parser.add_argument("--benchmark-single", type=int, metavar="N",
+                        help="time N single-record calls on rows of diabetes.csv")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    args = parser.parse_args()
+
+    scorer = DiabetesScorer(args.model, threshold=args.threshold)
+
+    if args.record:
+        print(json.dumps(scorer.score_record(json.loads(args.record))))
+
+    if args.input:
+        stats = scorer.score_csv(args.input, args.output, args.chunksize)
+        print(f"Scored {stats['rows']} rows in {stats['seconds']:.2f}s "
+              f"({stats['rows_per_second']:.0f} rows/s); scores saved as: {args.output}")
+
+    if args.benchmark_single:
+        records = pd.read_csv('diabetes.csv')[scorer.features].to_dict('records')
+        latencies = []
+        for i in range(args.benchmark_single):
+            start = time.perf_counter()
+            scorer.score_record(records[i % len(records)])
+            latencies.append(time.perf_counter() - start)
+        latencies = np.array(latencies) * 1000
+        print(f"Single record: p50 {np.percentile(latencies, 50):.2f} ms, "
+              f"p95 {np.percentile(latencies, 95):.2f} ms over {args.benchmark_single} calls")
+
+
+if __name__ == "__main__":
+    main()
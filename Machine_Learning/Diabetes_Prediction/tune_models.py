@@ -0,0 +1,144 @@
+"""Cross-validated hyperparameter search with successive halving for the Diabetes classifiers.
+
+Each classifier in Diabetes_Classification.classifiers is tuned inside an
+imblearn Pipeline (SMOTE -> polynomial features -> scaler -> classifier), so
+SMOTE only ever sees the training part of each fold and no synthetic samples
+leak into validation. Candidates are sampled from per-model search spaces and
+pruned with HalvingRandomSearchCV; folds are fitted in parallel. The best
+pipeline is scored once on a stratified hold-out split of the original data:
+
+    python tune_models.py --n-candidates 60 --factor 3 --cv 5
+    python tune_models.py --models LogisticRegression SVC --seed 123
+"""
+import argparse
+import json
+import time
+
+import pandas as pd
+from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline
+from scipy.stats import loguniform, randint, uniform
+from sklearn.base import clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import HalvingRandomSearchCV, StratifiedKFold, train_test_split
+from sklearn.preprocessing import PolynomialFeatures, StandardScaler
+
+from Diabetes_Classification import classifiers
+from preprocessing import PREPROCESSING
+
+# Search space per classifier; keys address the "clf" step of the pipeline
+SEARCH_SPACES = {
+    "RandomForest": {
+        "clf__n_estimators": randint(100, 600),
+        "clf__max_depth": [None, 4, 6, 8, 12, 16],
+        "clf__min_samples_leaf": randint(1, 10),
+        "clf__max_features": ["sqrt", "log2", 0.5],
+    },
+    "GradientBoosting": {
+        "clf__n_estimators": randint(50, 400),
+        "clf__learning_rate": loguniform(0.01, 0.3),
+        "clf__max_depth": randint(2, 6),
+        "clf__subsample": uniform(0.6, 0.4),
+    },
+    "AdaBoost": {
+        "clf__n_estimators": randint(50, 500),
+        "clf__learning_rate": loguniform(0.01, 2.0),
+    },
+    "LogisticRegression": {
+        "clf__C": loguniform(1e-3, 1e2),
+    },
+    "SVC": {
+        "clf__C": loguniform(1e-2, 1e2),
+        "clf__gamma": loguniform(1e-4, 1e0),
+    },
+}
+
+
+def build_pipeline(classifier, seed, config=PREPROCESSING):
+    """Same preprocessing as the training script, with SMOTE applied per fold."""
+    return Pipeline([
+        ("smote", SMOTE(random_state=seed)),
+        ("poly", PolynomialFeatures(degree=config["degree"], interaction_only=config["interaction_only"],
+                                    include_bias=False)),
+        ("scaler", StandardScaler()),
+        ("clf", clone(classifier)),
+    ])
+
+
+def tune(classifier_name, X_train, y_train, X_test, y_test, seed=42, n_candidates=60, factor=3, cv=5,
+         min_resources=None, n_jobs=-1):
+    """Successive-halving random search for one classifier; returns a result dict.
+
+    The first round trains on min_resources samples (default 30 per fold),
+    enough for SMOTE to find its nearest minority neighbours in every fold.
+    """
+    search = HalvingRandomSearchCV(
+        build_pipeline(classifiers[classifier_name], seed),
+        SEARCH_SPACES[classifier_name],
+        n_candidates=n_candidates,
+        factor=factor,
+        min_resources=min_resources or 30 * cv,
+        cv=StratifiedKFold(n_splits=cv, shuffle=True, random_state=seed),
+        scoring="roc_auc",
+        random_state=seed,
+        n_jobs=n_jobs,
+    )
+    start = time.perf_counter()
+    search.fit(X_train, y_train)
+    elapsed = time.perf_counter() - start
+
+    configs = len(search.cv_results_["params"])  # candidate evaluations summed over all halving rounds
+    test_auc = roc_auc_score(y_test, search.best_estimator_.predict_proba(X_test)[:, 1])
+    return {
+        "classifier": classifier_name,
+        "best_params": {key.removeprefix("clf__"): getattr(value, "item", lambda: value)()
+                        for key, value in search.best_params_.items()},
+        "cv_roc_auc": float(search.best_score_),
+        "test_roc_auc": float(test_auc),
+        "iterations": int(search.n_iterations_),
+        "configs_evaluated": configs,
+        "fits": configs * cv,
+        "seconds": elapsed,
+        "configs_per_minute": configs / elapsed * 60,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", nargs="+", default=list(SEARCH_SPACES), choices=list(SEARCH_SPACES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--n-candidates", type=int, default=60, help="candidates sampled for the first round")
+    parser.add_argument("--factor", type=int, default=3, help="halving factor between rounds")
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--min-resources", type=int, help="samples in the first round (default 30 per fold)")
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--output", default="tuning_results.json")
+    args = parser.parse_args()
+
+    # Load the dataset; the hold-out split is taken before any resampling
+    df = pd.read_csv('diabetes.csv')
+    X = df.drop(columns=['Outcome'])
+    y = df['Outcome']
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=PREPROCESSING["test_size"], stratify=y, random_state=args.seed)
+
+    results = []
+    print(f"{'classifier':<20} {'cv AUC':>7} {'test AUC':>8} {'configs':>7} {'seconds':>8} {'configs/min':>11}")
+    for classifier_name in args.models:
+        result = tune(classifier_name, X_train, y_train, X_test, y_test, seed=args.seed,
+                      n_candidates=args.n_candidates, factor=args.factor, cv=args.cv,
+                      min_resources=args.min_resources, n_jobs=args.n_jobs)
+        results.append(result)
+        print(f"{classifier_name:<20} {result['cv_roc_auc']:>7.4f} {result['test_roc_auc']:>8.4f} "
+              f"{result['configs_evaluated']:>7} {result['seconds']:>8.1f} {result['configs_per_minute']:>11.1f}")
+        print(f"    best: {result['best_params']}")
+
+    with open(args.output, 'w') as f:
+        json.dump({"seed": args.seed, "n_candidates": args.n_candidates, "factor": args.factor,
+                   "cv": args.cv, "results": results}, f, indent=2)
+    print(f"Tuning results saved as: {args.output}")
+
+
+if __name__ == "__main__":
+    main()